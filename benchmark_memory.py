@@ -0,0 +1,99 @@
+import gc
+import os
+import sys
+import tracemalloc
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import pygame
+pygame.init()
+pygame.display.set_mode((1, 1))
+import src.widgets as widgets
+
+NUM_WIDGETS = 2000
+SIZE = (32, 16)
+SCREENS = 200  # Screens built and disposed of by the leak check.
+SCREEN_WIDGETS = 50
+
+# Python side bytes per widget (tracemalloc doesn't see SDL's pixel buffers). Exceeding one fails the run.
+BUDGETS = {
+    'BaseWidget': 370,
+    'Button': 520,
+    'Slider': 900,
+    'ContinuousSlider': 760,
+    'VerticalSlider': 750,
+    'TextBox': 1000,  # Keeps its laid out lines and their images, for updates that skip the layout.
+    'TextInput2': 820,
+}
+LEAK_BUDGET = 16 * 1024  # Bytes the leak check may grow by over all the screens, for allocator noise.
+
+factories = {
+    'BaseWidget': lambda **kwargs: widgets.BaseWidget(pos=(0, 0), size=SIZE, **kwargs),
+    'Button': lambda **kwargs: widgets.Button(pos=(0, 0), size=SIZE, **kwargs),
+    'Slider': lambda **kwargs: widgets.Slider([1, 2, 3, 4], pos=(0, 0), size=SIZE, **kwargs),
+    'ContinuousSlider': lambda **kwargs: widgets.ContinuousSlider(0, 1, pos=(0, 0), size=SIZE, **kwargs),
+    'VerticalSlider': lambda **kwargs: widgets.VerticalSlider(0, 1, pos=(0, 0), size=SIZE, **kwargs),
+    'TextBox': lambda **kwargs: widgets.TextBox(pos=(0, 0), size=SIZE, text='Label', **kwargs),
+    'TextInput2': lambda **kwargs: widgets.TextInput2(pos=(0, 0), size=SIZE, **kwargs),
+}
+
+
+def measure(factory, num):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    created = [factory() for _ in range(num)]
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    python_bytes = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    pixel_bytes = sum(widget.image.get_width() * widget.image.get_height() * widget.image.get_bytesize()
+                      for widget in created)
+    for widget in created:
+        widget.kill()
+    return python_bytes / num, pixel_bytes / num
+
+
+def screen_churn(screens):
+    """Builds and disposes of 'screens' screens of every widget class, returning how much memory stayed behind."""
+    def build_screen():
+        screen = widgets.WidgetManager()
+        for _ in range(SCREEN_WIDGETS // len(factories)):
+            for factory in factories.values():
+                factory(manager=screen)
+        screen.update()
+        screen.draw(surface)
+        screen.dispose()
+
+    surface = pygame.Surface((64, 64))
+    build_screen()  # Warm up, so first time allocations aren't counted.
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(screens):
+        build_screen()
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+
+
+# Warm up the font index and pygame's lazily allocated state so it isn't billed to the first class.
+factories['TextBox']()
+widgets.all_widgets.empty()
+
+failed = []
+print("{:<18} {:>14} {:>14} {:>8}".format('Widget', 'Python B/w', 'Pixels B/w', 'Budget'))
+for name, factory in factories.items():
+    python_bytes, pixel_bytes = measure(factory, NUM_WIDGETS)
+    budget = BUDGETS[name]
+    print("{:<18} {:>14.0f} {:>14.0f} {:>8}".format(name, python_bytes, pixel_bytes, budget))
+    if python_bytes > budget:
+        failed.append(name)
+
+leaked = screen_churn(SCREENS)
+print("{} screens built and disposed of: {} bytes left behind (budget {})".format(SCREENS, leaked, LEAK_BUDGET))
+if leaked > LEAK_BUDGET:
+    failed.append('screen disposal')
+
+if failed:
+    print("Over budget: {}".format(', '.join(failed)))
+    sys.exit(1)
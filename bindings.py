@@ -0,0 +1,115 @@
+import itertools
+import pygame
+
+# Left and right variants collapse into one group and lock keys (num, caps, mode) are ignored, so a binding on
+# KMOD_CTRL fires for either control key regardless of caps lock.
+MODIFIER_GROUPS = (pygame.KMOD_SHIFT, pygame.KMOD_CTRL, pygame.KMOD_ALT, pygame.KMOD_GUI)
+ANY_MODIFIER = None
+
+KEY_EVENTS = (pygame.KEYDOWN, pygame.KEYUP)
+BUTTON_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+
+
+def normalize_modifiers(mod):
+    mask = 0
+    for group in MODIFIER_GROUPS:
+        if mod & group:
+            mask |= group
+    return mask
+
+
+def event_code(event):
+    """The key or mouse button of the event, or None for events that have neither."""
+    if event.type in KEY_EVENTS:
+        return event.key
+    if event.type in BUTTON_EVENTS:
+        return event.button
+    return None
+
+
+class KeyBindings:
+    """
+    Dispatches events to handlers bound on (event type, key or button, modifiers) with one dict lookup, however many
+    bindings there are. Generalizes the 'event_list' dispatch in code/event_handler.py.
+
+    Several handlers can share a binding; they're called from highest to lowest priority (in order of binding for
+    equal priorities) and a handler returning True stops the event from reaching the rest.
+    """
+
+    def __init__(self):
+        self._handlers = {}  # (event type, code, modifier mask) -> tuple of (-priority, order, handler).
+        self._order = itertools.count()
+
+    def _key(self, event_type, code, mod):
+        if isinstance(code, str):
+            code = pygame.key.key_code(code)
+        return event_type, code, mod if mod is ANY_MODIFIER else normalize_modifiers(mod)
+
+    def bind(self, event_type, code, handler, mod=0, priority=0):
+        """
+        :param event_type: E.g. pygame.KEYDOWN, pygame.MOUSEBUTTONUP or pygame.QUIT.
+        :param code: Key (pygame.K_* or a name such as 'a'), mouse button, or None for events without either.
+        :param handler: Called with the event. Return True to stop propagation.
+        :param mod: Modifiers that must be held (pygame.KMOD_*), or ANY_MODIFIER.
+        :param priority: Higher runs first.
+        """
+        key = self._key(event_type, code, mod)
+        entries = self._handlers.get(key, ()) + ((-priority, next(self._order), handler),)
+        self._handlers[key] = tuple(sorted(entries, key=lambda entry: entry[:2]))
+
+    def bind_many(self, bindings):
+        """Binds an iterable of (event_type, code, handler[, mod[, priority]]) tuples in one go."""
+        pending = {}
+        for binding in bindings:
+            event_type, code, handler, mod, priority = (tuple(binding) + (0, 0))[:5]
+            key = self._key(event_type, code, mod)
+            pending.setdefault(key, list(self._handlers.get(key, ()))).append((-priority, next(self._order), handler))
+        for key, entries in pending.items():
+            self._handlers[key] = tuple(sorted(entries, key=lambda entry: entry[:2]))
+
+    def unbind(self, event_type, code, handler, mod=0):
+        key = self._key(event_type, code, mod)
+        entries = tuple(entry for entry in self._handlers.get(key, ()) if entry[2] != handler)
+        if entries:
+            self._handlers[key] = entries
+        else:
+            self._handlers.pop(key, None)
+
+    def key_down(self, key, handler, mod=0, priority=0):
+        self.bind(pygame.KEYDOWN, key, handler, mod, priority)
+
+    def key_up(self, key, handler, mod=0, priority=0):
+        self.bind(pygame.KEYUP, key, handler, mod, priority)
+
+    def mouse_down(self, button, handler, mod=ANY_MODIFIER, priority=0):
+        self.bind(pygame.MOUSEBUTTONDOWN, button, handler, mod, priority)
+
+    def mouse_up(self, button, handler, mod=ANY_MODIFIER, priority=0):
+        self.bind(pygame.MOUSEBUTTONUP, button, handler, mod, priority)
+
+    def dispatch(self, event):
+        """Calls the handlers bound to the event. Returns True if one of them stopped propagation."""
+        event_type = event.type
+        code = event_code(event)
+        if event_type in KEY_EVENTS:
+            mod = normalize_modifiers(event.mod)
+        elif event_type in BUTTON_EVENTS:
+            mod = normalize_modifiers(pygame.key.get_mods())
+        else:
+            mod = 0
+
+        exact = self._handlers.get((event_type, code, mod), ())
+        anything = self._handlers.get((event_type, code, ANY_MODIFIER), ())
+        if exact and anything:
+            entries = sorted(exact + anything, key=lambda entry: entry[:2])
+        else:
+            entries = exact or anything
+
+        for _, _, handler in entries:
+            if handler(event):
+                return True
+        return False
+
+    def dispatch_all(self, events):
+        for event in events:
+            self.dispatch(event)
@@ -0,0 +1,202 @@
+import asyncio
+import time
+import pygame
+import src.event
+
+
+class FrameDriver:
+    """
+    Runs the frames of a WidgetManager. While something is going on (input, dirty widgets, pending renders) it ticks at
+    'fps' like the usual loop; when nothing is, it sleeps in pygame.event.wait until the next input or widget timer
+    (such as a caret blink), so an idle UI costs next to no CPU.
+
+        driver = FrameDriver(widgets.all_widgets, fps=30)
+        while True:
+            for event in driver.next_frame():
+                ...
+            driver.render()
+    """
+
+    def __init__(self, manager, surface=None, fps=30, idle=True, max_wait=None, background=(0, 0, 0), renderer=None):
+        """
+        :param surface: Surface to draw on; the display surface if None (so it follows pygame.display.set_mode).
+        :param renderer: src.renderer.TextureRenderer to draw with instead of a surface.
+        :param idle: Whether to block while idle. False behaves like a plain clock.tick(fps) loop.
+        :param max_wait: Longest sleep in milliseconds, or None to sleep until there's something to do.
+        """
+        self.manager = manager
+        self.surface = surface
+        self.fps = fps
+        self.idle = idle
+        self.max_wait = max_wait
+        self.background = background
+        self.renderer = renderer
+        self.clock = pygame.time.Clock()
+        self._awake = True
+
+    def invalidate(self):
+        """Makes the next frame run right away, for changes the manager can't know about (app state, animations)."""
+        self._awake = True
+
+    def is_idle(self):
+        return self.idle and not self._awake and not self.manager.is_busy()
+
+    def wait_time(self):
+        """Milliseconds the next frame may sleep for; negative means until the next event."""
+        timer = self.manager.next_timer()
+        wait = -1 if timer is None else max(1, timer - src.event.get_ticks())
+        if self.max_wait is not None:
+            wait = self.max_wait if wait < 0 else min(wait, self.max_wait)
+        return wait
+
+    def next_frame(self):
+        """Waits for the next frame (ticking, or sleeping while idle) and returns its events."""
+        if self.is_idle():
+            src.event.update(wait=self.wait_time())
+            self.clock.tick()  # Just restarts the frame timer; the sleep happened above.
+        else:
+            self.clock.tick(self.fps)
+            src.event.update()
+        self._awake = bool(src.event.events)
+        return src.event.get()
+
+    def render(self):
+        self.manager.update()
+        self.draw()
+
+    def draw(self):
+        if self.renderer is not None:
+            self.renderer.draw(self.manager, self.background)
+            return
+        surface = self.surface if self.surface is not None else pygame.display.get_surface()
+        surface.fill(self.background)
+        self.manager.draw(surface)
+        pygame.display.update()
+
+
+class AsyncFrameDriver(FrameDriver):
+    """
+    FrameDriver for asyncio apps. Frames are paced with asyncio.sleep instead of blocking, so network clients and other
+    tasks run between them, and UI events can be awaited:
+
+        async def main():
+            driver = AsyncFrameDriver(widgets.all_widgets, fps=30)
+            ui = asyncio.ensure_future(driver.run(handle_events))
+            await driver.clicked(ok_button)
+            ...
+
+    Widgets are updated a few at a time: whenever a frame has worked for 'frame_budget', other tasks get to run
+    before it goes on. While idle, the driver wakes up for input, for invalidate() or stop(), and for widgets changed by
+    other tasks (within 'idle_poll').
+    """
+
+    def __init__(self, manager, surface=None, fps=30, idle=True, max_wait=None, background=(0, 0, 0), renderer=None,
+                 frame_budget=None, idle_poll=50):
+        """
+        :param frame_budget: Milliseconds of work after which the frame yields to other tasks; 1000 / fps if None.
+        :param idle_poll: Milliseconds between checks for input while idle. SDL can't wake asyncio up on input, so
+                          the queue is polled, which is still next to free.
+        """
+        super(AsyncFrameDriver, self).__init__(manager, surface, fps, idle, max_wait, background, renderer)
+        self.frame_budget = frame_budget if frame_budget is not None else 1000 / fps
+        self.idle_poll = idle_poll
+        self._waiters = []  # (event type, predicate, future) of wait_for().
+        self._last_frame = 0.0
+        self._running = False
+        self._wake = None  # asyncio.Event set by invalidate() and stop(), made by run() in its loop.
+
+    def invalidate(self):
+        super(AsyncFrameDriver, self).invalidate()
+        if self._wake is not None:
+            self._wake.set()
+
+    async def next_frame_async(self):
+        """Waits for the next frame without blocking the event loop and returns its events."""
+        if self.is_idle():
+            await self._wait_for_input(self.wait_time())
+        else:
+            await asyncio.sleep(max(0.0, self._last_frame + 1 / self.fps - time.perf_counter()))
+        self._last_frame = time.perf_counter()
+        self.clock.tick()  # Only measures, for clock.get_time().
+        src.event.update()
+        self._awake = bool(src.event.events)
+        events = src.event.get()
+        if self._waiters:
+            self._resolve_waiters(events)
+        return events
+
+    async def _wait_for_input(self, wait):
+        deadline = None if wait < 0 else time.perf_counter() + wait / 1000
+        while self._running and not self._awake and not src.event.pending() and not self.manager.is_busy():
+            delay = self.idle_poll / 1000
+            if deadline is not None:
+                delay = min(delay, deadline - time.perf_counter())
+                if delay <= 0:
+                    return
+            if self._wake is None:
+                await asyncio.sleep(delay)
+                continue
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self, handle_events=None):
+        """
+        Runs frames until stop().
+
+        :param handle_events: Optional callable getting each frame's events, for the app logic outside the manager.
+        """
+        self._running = True
+        self._wake = asyncio.Event()
+        try:
+            while self._running:
+                events = await self.next_frame_async()
+                if not self._running:
+                    break
+                if handle_events is not None:
+                    handle_events(events)
+                deadline = time.perf_counter() + self.frame_budget / 1000
+                for _ in self.manager.update_steps():
+                    if time.perf_counter() > deadline:
+                        await asyncio.sleep(0)
+                        if not self._running:
+                            return
+                        deadline = time.perf_counter() + self.frame_budget / 1000
+                if time.perf_counter() > deadline:
+                    await asyncio.sleep(0)
+                self.draw()
+        finally:
+            self._wake = None
+
+    def stop(self):
+        self._running = False
+        if self._wake is not None:
+            self._wake.set()
+
+    def wait_for(self, event_type, predicate=None):
+        """Future of the next event of 'event_type' (for which 'predicate' is true, if given)."""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((event_type, predicate, future))
+        return future
+
+    def clicked(self, widget, button=1):
+        """Future of the next click (release of 'button') on the widget while it's visible and enabled."""
+        return self.wait_for(pygame.MOUSEBUTTONUP, lambda event: (
+            event.button == button and widget.visible and widget.enabled and widget.rect.collidepoint(event.pos)
+        ))
+
+    def _resolve_waiters(self, events):
+        waiting = []
+        for waiter in self._waiters:
+            event_type, predicate, future = waiter
+            if future.done():  # Cancelled.
+                continue
+            for event in events:
+                if event.type == event_type and (predicate is None or predicate(event)):
+                    future.set_result(event)
+                    break
+            else:
+                waiting.append(waiter)
+        self._waiters = waiting
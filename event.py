@@ -1,18 +1,161 @@
-import pygame
-
-
-events = []
-
-
-def update():
-    global events
-    events = []
-    for event in pygame.event.get():
-        events.append(event)
-
-
-def get(event_type=None):
-    if event_type:
-        return (x for x in events if x.type == event_type)
-    else:
-        return tuple(events)
\ No newline at end of file
+import atexit
+import gzip
+import json
+import pygame
+
+
+events = []
+
+RECORDING_VERSION = 2
+_BASIC_TYPES = (bool, int, float, str, type(None))
+
+# Where events, time and mouse state come from. Swapped by src.replay to drive the widgets from a recording.
+_source = pygame.event.get
+_clock = pygame.time.get_ticks
+_mouse = None  # [pos, pressed] tracked from the events while replaying; None asks pygame.
+_recorder = None
+_coalesce_motion = True
+
+
+def update(wait=0):
+    """
+    Collects the events of this frame.
+
+    :param wait: 0 returns immediately. Otherwise blocks until there's an event, or at most 'wait' milliseconds if
+                 positive, without using any CPU.
+    """
+    global events
+    first = None
+    if wait and _source is pygame.event.get:
+        first = pygame.event.wait(wait) if wait > 0 else pygame.event.wait()
+    events = _source()
+    if first is not None and first.type != pygame.NOEVENT:
+        events.insert(0, first)
+    if _coalesce_motion and len(events) > 1:
+        events = _coalesce(events)
+
+    if _mouse is not None:
+        _track_mouse(events)
+    if _recorder is not None:
+        _recorder.write(events)
+
+
+def _coalesce(frame):
+    # Runs of MOUSEMOTION become their last event, with the 'rel' of the whole run.
+    coalesced = []
+    for event in frame:
+        if event.type == pygame.MOUSEMOTION and coalesced and coalesced[-1].type == pygame.MOUSEMOTION:
+            rel = coalesced[-1].rel
+            attributes = dict(event.dict, rel=(rel[0] + event.rel[0], rel[1] + event.rel[1]))
+            coalesced[-1] = pygame.event.Event(pygame.MOUSEMOTION, attributes)
+        else:
+            coalesced.append(event)
+    return coalesced
+
+
+def set_motion_coalescing(enabled):
+    """
+    Whether update() merges consecutive MOUSEMOTION events into one (the last, with their summed 'rel'), so a drag
+    gives one motion event per frame. On by default; turn it off for e.g. drawing every point of a stroke.
+    """
+    global _coalesce_motion
+    _coalesce_motion = enabled
+
+
+def allow_only(event_types):
+    """
+    Makes SDL drop every event not of 'event_types' before it's queued, so they cost nothing per frame; QUIT always
+    comes through. None lets every type through again.
+    """
+    if event_types is None:
+        pygame.event.set_allowed(None)
+        return
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(sorted(set(event_types) | {pygame.QUIT}))
+
+
+def pending():
+    """Whether input is waiting to be collected by update(). Always True while replaying."""
+    if _source is not pygame.event.get:
+        return True
+    pygame.event.pump()
+    return pygame.event.peek()
+
+
+def get(event_type=None):
+    if event_type:
+        return (x for x in events if x.type == event_type)
+    else:
+        return tuple(events)
+
+
+def get_ticks():
+    """Milliseconds like pygame.time.get_ticks(), but from the recording's clock while replaying."""
+    return _clock()
+
+
+def mouse_pos():
+    return pygame.mouse.get_pos() if _mouse is None else _mouse[0]
+
+
+def mouse_pressed():
+    return pygame.mouse.get_pressed() if _mouse is None else _mouse[1]
+
+
+def _track_mouse(frame):
+    for event in frame:
+        if event.type == pygame.MOUSEMOTION:
+            _mouse[0] = event.pos
+        elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP) and 1 <= event.button <= 3:
+            _mouse[0] = event.pos
+            pressed = list(_mouse[1])
+            pressed[event.button - 1] = event.type == pygame.MOUSEBUTTONDOWN
+            _mouse[1] = tuple(pressed)
+
+
+def _basic(value):
+    if isinstance(value, _BASIC_TYPES):
+        return True
+    return isinstance(value, tuple) and all(isinstance(x, _BASIC_TYPES) for x in value)
+
+
+class Recorder:
+    """
+    Writes one record per update(): the tick time and every event as (type, attributes). The file is gzipped JSON
+    lines starting with a header, see src.replay.load(); plain data only, so loading a recording can't run code.
+    """
+
+    def __init__(self, path, metadata=None):
+        self.file = gzip.open(path, 'wt', encoding='utf-8')
+        self._write({'version': RECORDING_VERSION, 'metadata': metadata or {}})
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+    def write(self, frame):
+        records = [
+            (event.type, {key: value for key, value in event.dict.items() if _basic(value)}) for event in frame
+        ]
+        self._write((get_ticks(), records))
+
+    def close(self):
+        self.file.close()
+
+
+def record(path, metadata=None):
+    """
+    Records the event stream and frame times from now on, until stop_recording() or exit.
+
+    :param metadata: JSON serializable dict stored in the header, e.g. what's needed to rebuild the same widgets on replay.
+    """
+    global _recorder
+    stop_recording()
+    _recorder = Recorder(path, metadata)
+    atexit.register(stop_recording)
+
+
+def stop_recording():
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+        _recorder = None
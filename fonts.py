@@ -0,0 +1,328 @@
+import json
+import os
+import struct
+import sys
+import tempfile
+import threading
+import pygame
+import pygame.freetype
+import src.stats
+
+# Font name -> {(bold, italic): path}. Built from the font directories once and persisted to CACHE_PATH, keyed by the
+# modification times of every scanned directory, so later startups skip the scan (and pygame's call to fc-list).
+FONT_EXTENSIONS = ('.ttf', '.ttc', '.otf')
+
+if sys.platform == 'win32':
+    FONT_DIRS = [
+        os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts'),
+        os.path.join(os.environ.get('LOCALAPPDATA', ''), 'Microsoft', 'Windows', 'Fonts'),
+    ]
+    CACHE_DIR = os.path.join(os.environ.get('LOCALAPPDATA', os.path.expanduser('~')), 'pygwig')
+elif sys.platform == 'darwin':
+    FONT_DIRS = ['/Library/Fonts', '/System/Library/Fonts', os.path.expanduser('~/Library/Fonts')]
+    CACHE_DIR = os.path.expanduser('~/Library/Caches/pygwig')
+else:
+    FONT_DIRS = [
+        '/usr/share/fonts', '/usr/local/share/fonts', os.path.expanduser('~/.fonts'),
+        os.path.join(os.environ.get('XDG_DATA_HOME', os.path.expanduser('~/.local/share')), 'fonts'),
+    ]
+    CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'pygwig')
+
+CACHE_PATH = os.path.join(CACHE_DIR, 'fonts.json')
+CACHE_VERSION = 1
+
+# Same idea as pygame's aliases: if the requested name isn't installed, use the first one of its group that is.
+ALIASES = (
+    ('sans', 'arial', 'helvetica', 'freesans', 'dejavusans', 'liberationsans', 'verdana', 'tahoma', 'ubuntu'),
+    ('serif', 'times', 'timesnewroman', 'freeserif', 'dejavuserif', 'liberationserif', 'georgia'),
+    ('mono', 'monospace', 'couriernew', 'courier', 'freemono', 'dejavusansmono', 'liberationmono', 'consolas'),
+)
+
+# What SysFont() returns: 'font' for a pygame.font.Font per size, 'freetype' for a SizedFace over one shared
+# pygame.freetype.Font per face.
+BACKENDS = ('font', 'freetype')
+
+_index = None
+_aliases = {}
+_index_lock = threading.RLock()  # Render workers may all ask for the index at startup; only one builds it.
+_backend = 'font'
+_faces = {}  # (name, bold, italic) -> pygame.freetype.Font.
+
+
+def _simple_name(name):
+    return ''.join(c.lower() for c in name if c.isalnum())
+
+
+def _read_family_and_style(path):
+    """Reads the family and subfamily from the font's 'name' table. Returns None if the file can't be parsed."""
+    with open(path, 'rb') as file:
+        header = file.read(12)
+        if header[:4] == b'ttcf':  # Collection; use the first face.
+            offset, = struct.unpack('>I', file.read(4))
+            file.seek(offset)
+            header = file.read(12)
+        num_tables, = struct.unpack('>H', header[4:6])
+        records = file.read(16 * num_tables)
+        for i in range(num_tables):
+            tag, _, offset, length = struct.unpack('>4sIII', records[16 * i: 16 * i + 16])
+            if tag == b'name':
+                break
+        else:
+            return None
+        file.seek(offset)
+        table = file.read(length)
+
+    _, count, string_offset = struct.unpack('>HHH', table[:6])
+    names = {}
+    for i in range(count):
+        platform, _, language, name_id, length, offset = struct.unpack('>6H', table[6 + 12 * i: 18 + 12 * i])
+        if name_id not in (1, 2):
+            continue
+        raw = table[string_offset + offset: string_offset + offset + length]
+        if platform in (0, 3):
+            text = raw.decode('utf-16-be', 'ignore')
+        elif platform == 1:
+            text = raw.decode('latin-1')
+        else:
+            continue
+        # Prefer the English Windows record, otherwise take the first one found.
+        if (platform == 3 and language == 0x409) or name_id not in names:
+            names[name_id] = text
+    if 1 not in names:
+        return None
+    return names[1], names.get(2, '')
+
+
+def _describe(path):
+    try:
+        family_and_style = _read_family_and_style(path)
+    except (OSError, struct.error, IndexError):
+        family_and_style = None
+    if family_and_style is None:
+        # Fall back on the file name, e.g. 'DejaVuSans-BoldOblique.ttf'.
+        family, _, style = os.path.splitext(os.path.basename(path))[0].partition('-')
+    else:
+        family, style = family_and_style
+    style = style.lower()
+    return _simple_name(family), 'bold' in style, 'italic' in style or 'oblique' in style
+
+
+def _directory_mtimes():
+    mtimes = {}
+    for root in FONT_DIRS:
+        for directory, _, _ in os.walk(root):
+            try:
+                mtimes[directory] = os.stat(directory).st_mtime
+            except OSError:
+                pass
+    return mtimes
+
+
+def _is_valid(cache):
+    if cache.get('version') != CACHE_VERSION or set(cache.get('roots', ())) != set(FONT_DIRS):
+        return False
+    # A font added or removed anywhere in the tree changes the mtime of the directory containing it.
+    for directory, mtime in cache['mtimes'].items():
+        try:
+            if os.stat(directory).st_mtime != mtime:
+                return False
+        except OSError:
+            return False
+    # Roots that didn't exist when the cache was built.
+    return all(root in cache['mtimes'] or not os.path.isdir(root) for root in FONT_DIRS)
+
+
+def _scan():
+    fonts = {}
+    for root in FONT_DIRS:
+        for directory, _, files in os.walk(root):
+            for file in sorted(files):
+                if os.path.splitext(file)[1].lower() in FONT_EXTENSIONS:
+                    path = os.path.join(directory, file)
+                    name, bold, italic = _describe(path)
+                    if name:
+                        fonts.setdefault(name, {}).setdefault('{:d}{:d}'.format(bold, italic), path)
+    return fonts
+
+
+def _save(cache):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # A file of our own, so other processes writing the cache at the same time can't mix into it.
+        handle, temporary = tempfile.mkstemp(prefix='fonts.', suffix='.tmp', dir=CACHE_DIR)
+        try:
+            with os.fdopen(handle, 'w') as file:
+                json.dump(cache, file)
+            os.replace(temporary, CACHE_PATH)
+        except BaseException:
+            os.remove(temporary)
+            raise
+    except OSError:
+        pass  # Read-only home or similar; we'll just rescan next time.
+
+
+def _build_index(fonts):
+    # Sets the aliases along with the index; replaced rather than changed, for the threads reading them.
+    global _index, _aliases
+    index = {name: {(style[0] == '1', style[1] == '1'): path for style, path in styles.items()}
+             for name, styles in fonts.items()}
+    aliases = {}
+    for group in ALIASES:
+        found = next((index[name] for name in group if name in index), None)
+        if found:
+            for name in group:
+                if name not in index:
+                    aliases[name] = found
+    _aliases = aliases
+    _index = index
+    return index
+
+
+def rebuild():
+    """Rescans the font directories and rewrites the cache."""
+    with _index_lock:
+        mtimes = _directory_mtimes()
+        fonts = _scan()
+        _save({'version': CACHE_VERSION, 'roots': FONT_DIRS, 'mtimes': mtimes, 'fonts': fonts})
+        return _build_index(fonts)
+
+
+def load():
+    """Returns the font index, reading it from the cache if the font directories haven't changed since it was built."""
+    index = _index
+    if index is not None:
+        return index
+    with _index_lock:
+        if _index is not None:  # Built by another thread while this one waited.
+            return _index
+        try:
+            with open(CACHE_PATH) as file:
+                cache = json.load(file)
+        except (OSError, ValueError):
+            cache = None
+        if cache is None or not _is_valid(cache):
+            return rebuild()
+        return _build_index(cache['fonts'])
+
+
+def get_fonts():
+    """Drop-in for pygame.font.get_fonts()."""
+    return sorted(load())
+
+
+def _match(name, bold, italic):
+    index = load()
+    for single_name in name.split(',') if isinstance(name, str) else name:
+        single_name = _simple_name(single_name)
+        styles = index.get(single_name) or _aliases.get(single_name)
+        if styles:
+            if (bold, italic) in styles:
+                return styles[bold, italic], bold, italic
+            if (False, False) in styles:
+                return styles[False, False], False, False
+            style, path = next(iter(styles.items()))
+            return path, style[0], style[1]
+    return None, False, False
+
+
+def match_font(name, bold=False, italic=False):
+    """
+    Drop-in for pygame.font.match_font(). Returns the path of the best matching font file, or None.
+
+    :param name: Font name, or comma separated font names to try in order.
+    """
+    return _match(name, bold, italic)[0] if name else None
+
+
+def set_backend(backend):
+    """
+    Chooses what SysFont() returns, see BACKENDS. With 'freetype' there's no font object per size: every face is
+    loaded once and measures and renders at any size, with kerning, which makes fitting text to a box much cheaper.
+    """
+    global _backend
+    if backend not in BACKENDS:
+        raise ValueError("Unknown font backend {!r}, expected one of {}".format(backend, BACKENDS))
+    _backend = backend
+
+
+def get_backend():
+    return _backend
+
+
+def Face(name, bold=False, italic=False):
+    """The pygame.freetype.Font of a face, loaded once. Every call to it has to pass the size."""
+    key = (name, bold, italic)
+    face = _faces.get(key)
+    if face is None:
+        if not pygame.freetype.get_init():
+            pygame.freetype.init()
+        path, got_bold, got_italic = _match(name, bold, italic) if name else (None, False, False)
+        face = pygame.freetype.Font(path, 0)
+        src.stats.counters['font_constructions'] += 1
+        face.pad = True  # Rects and surfaces span the whole line height, like pygame.font's.
+        face.kerning = True
+        # Fake the styles the matched file doesn't have.
+        face.strong = bold and not got_bold
+        face.oblique = italic and not got_italic
+        _faces[key] = face
+    return face
+
+
+class SizedFace:
+    """
+    A freetype face at one size, with the methods of pygame.font.Font the widgets use plus render_to(), which draws
+    straight onto a surface. Creating one costs nothing, the face is shared.
+    """
+
+    __slots__ = ('face', 'point_size')
+
+    def __init__(self, face, point_size):
+        self.face = face
+        self.point_size = max(1, point_size)  # pygame.font takes 0 for "too small to fit"; freetype doesn't.
+
+    def size(self, text):
+        return self.face.get_rect(text, size=self.point_size).width, self.face.get_sized_height(self.point_size)
+
+    def get_rect(self, text):
+        """Size of what render() makes, which can be a little taller than size() (the line height) says."""
+        return self.face.get_rect(text, size=self.point_size)
+
+    def render(self, text, antialias, color, background=None):
+        face = self.face
+        if face.antialiased != bool(antialias):
+            face.antialiased = bool(antialias)
+        return face.render(text, color, background, size=self.point_size)[0]
+
+    def render_to(self, surface, dest, text, color, background=None):
+        """Draws onto 'surface' at 'dest' (top left). Unlike a blit it ignores the clip, use a subsurface instead."""
+        return self.face.render_to(surface, dest, text, color, background, size=self.point_size)
+
+    def get_linesize(self):
+        return self.face.get_sized_height(self.point_size)
+
+    def get_height(self):
+        return self.face.get_sized_height(self.point_size)
+
+    def get_ascent(self):
+        return self.face.get_sized_ascender(self.point_size)
+
+    def get_descent(self):
+        return self.face.get_sized_descender(self.point_size)
+
+
+def SysFont(name, size, bold=False, italic=False):
+    """
+    Drop-in for pygame.font.SysFont(), resolving the name through the cached index. Falls back on pygame's font.
+    Returns a SizedFace with the 'freetype' backend.
+    """
+    if _backend == 'freetype':
+        return SizedFace(Face(name, bold, italic), size)
+    path, got_bold, got_italic = _match(name, bold, italic) if name else (None, False, False)
+    font = pygame.font.Font(path, size)
+    src.stats.counters['font_constructions'] += 1
+    # Fake the styles the matched file doesn't have.
+    if bold and not got_bold:
+        font.set_bold(True)
+    if italic and not got_italic:
+        font.set_italic(True)
+    return font
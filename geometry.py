@@ -0,0 +1,170 @@
+import pygame
+
+try:
+    import numpy
+except ImportError:  # Optional; only GeometryStore needs it.
+    numpy = None
+
+
+class GeometryStore:
+    """
+    Keeps x, y, width and height of many widgets in NumPy arrays (one row per field, one column per widget), so moving,
+    scaling and hit-testing thousands of widgets is a handful of vectorized operations instead of a Python loop.
+
+    An attached widget's 'rect' is built from the arrays on access, so it's a copy: change the geometry by assigning
+    the widget a rect, through its move/resize methods or with the bulk methods here. Widgets attached later are considered on top
+    in hit-tests, hidden widgets aren't hit but still move and scale with the rest.
+    """
+
+    def __init__(self, capacity=64):
+        if numpy is None:
+            raise ImportError("GeometryStore requires numpy.")
+        self._data = numpy.zeros((4, capacity), dtype=numpy.int32)
+        self._used = numpy.zeros(capacity, dtype=bool)
+        self._visible = numpy.zeros(capacity, dtype=bool)
+        self._widgets = []
+        self._free = []
+
+    def __len__(self):
+        return len(self._widgets) - len(self._free)
+
+    @property
+    def x(self):
+        return self._data[0, :len(self._widgets)]
+
+    @property
+    def y(self):
+        return self._data[1, :len(self._widgets)]
+
+    @property
+    def w(self):
+        return self._data[2, :len(self._widgets)]
+
+    @property
+    def h(self):
+        return self._data[3, :len(self._widgets)]
+
+    def attach(self, *widgets):
+        for widget in widgets:
+            if widget._geometry is not None:
+                widget._geometry.detach(widget)
+            if self._free:
+                index = self._free.pop()
+                self._widgets[index] = widget
+            else:
+                index = len(self._widgets)
+                if index == self._data.shape[1]:
+                    self._grow()
+                self._widgets.append(widget)
+            self._data[:, index] = widget.rect
+            self._used[index] = True
+            self._visible[index] = widget.visible
+            widget._geometry = self
+            widget._index = index
+            widget._rect = None
+
+    def detach(self, widget):
+        """Gives the widget its own pygame.Rect again."""
+        index = widget._index
+        widget._rect = self.rect(index)
+        widget._geometry = None
+        widget._index = -1
+        self._widgets[index] = None
+        self._used[index] = False
+        self._visible[index] = False
+        self._free.append(index)
+
+    def _grow(self):
+        capacity = max(1, self._data.shape[1] * 2)
+        data = numpy.zeros((4, capacity), dtype=numpy.int32)
+        data[:, :self._data.shape[1]] = self._data
+        used = numpy.zeros(capacity, dtype=bool)
+        used[:self._used.shape[0]] = self._used
+        visible = numpy.zeros(capacity, dtype=bool)
+        visible[:self._visible.shape[0]] = self._visible
+        self._data, self._used, self._visible = data, used, visible
+
+    def _indices(self, widgets):
+        if widgets is None:
+            return numpy.flatnonzero(self._used[:len(self._widgets)])
+        return numpy.fromiter((widget._index for widget in widgets), dtype=numpy.intp)
+
+    def rect(self, index):
+        x, y, w, h = self._data[:, index].tolist()
+        return pygame.Rect(x, y, w, h)
+
+    def set_topleft(self, index, x, y):
+        self._data[0, index] = x
+        self._data[1, index] = y
+
+    def set_size(self, index, w, h):
+        self._data[2, index] = w
+        self._data[3, index] = h
+
+    def set_visible(self, index, visible):
+        self._visible[index] = visible
+
+    def move(self, dx, dy, widgets=None):
+        """Moves the widgets (all of them if None) by (dx, dy)."""
+        indices = self._indices(widgets)
+        self._data[0, indices] += dx
+        self._data[1, indices] += dy
+
+    def place(self, widgets, x, y, w=None, h=None):
+        """Sets the position, and optionally the size, of the widgets. Arguments are scalars or one value per widget."""
+        widgets = tuple(widgets)
+        indices = self._indices(widgets)
+        self._data[0, indices] = x
+        self._data[1, indices] = y
+        if w is not None or h is not None:
+            old = self._data[2:, indices].copy()
+            if w is not None:
+                self._data[2, indices] = w
+            if h is not None:
+                self._data[3, indices] = h
+            self._resized(widgets, indices, old)
+
+    def scale(self, fx, fy, widgets=None, origin=(0, 0)):
+        """Scales the position (relative to 'origin') and size of the widgets (all of them if None)."""
+        widgets = None if widgets is None else tuple(widgets)
+        indices = self._indices(widgets)
+        ox, oy = origin
+        data = self._data
+        data[0, indices] = numpy.rint(ox + (data[0, indices] - ox) * fx)
+        data[1, indices] = numpy.rint(oy + (data[1, indices] - oy) * fy)
+        old = data[2:, indices].copy()
+        data[2, indices] = numpy.rint(data[2, indices] * fx)
+        data[3, indices] = numpy.rint(data[3, indices] * fy)
+        self._resized([self._widgets[i] for i in indices] if widgets is None else widgets, indices, old)
+
+    def _resized(self, widgets, indices, old):
+        # Images have to follow the new sizes one by one; skip the ones whose size didn't change.
+        changed = numpy.flatnonzero((self._data[2:, indices] != old).any(axis=0))
+        for i in changed.tolist():
+            widgets[i].resize_image()
+
+    def _contains(self, px, py):
+        count = len(self._widgets)
+        x, y, w, h = self._data[:, :count]
+        px = numpy.asarray(px)[..., None]
+        py = numpy.asarray(py)[..., None]
+        return (px >= x) & (px < x + w) & (py >= y) & (py < y + h) & self._visible[:count]
+
+    def collidepoint(self, x, y):
+        """Returns every widget containing the point, bottom to top."""
+        return [self._widgets[i] for i in numpy.flatnonzero(self._contains(x, y)).tolist()]
+
+    def hit_test(self, points):
+        """
+        Finds the topmost widget under each point.
+
+        :param points: Sequence or array of (x, y).
+        :return: List with a widget, or None, per point.
+        """
+        points = numpy.asarray(points).reshape(-1, 2)
+        mask = self._contains(points[:, 0], points[:, 1])
+        if mask.shape[1] == 0:  # Nothing attached; argmax can't take an empty axis.
+            return [None] * len(points)
+        hit = mask.any(axis=1)
+        top = mask.shape[1] - 1 - numpy.argmax(mask[:, ::-1], axis=1)
+        return [self._widgets[i] if is_hit else None for i, is_hit in zip(top.tolist(), hit.tolist())]
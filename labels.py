@@ -0,0 +1,121 @@
+import argparse
+import collections
+import concurrent.futures
+import itertools
+import json
+import os
+import sys
+import pygame
+import src.fonts
+import src.widgets as widgets
+
+RAW_FORMAT = 'RGBA'
+
+Label = collections.namedtuple('Label', 'text size style')
+
+
+def render_label(text, size, style):
+    """
+    Renders text the way a TextBox of 'size' with 'style' (a src.widgets.Style) shows it: fitted to the box, with
+    its background, border and padding.
+    """
+    surface = pygame.Surface(size)
+    border, (pad_x, pad_y) = style.border_size, style.padding
+    area = surface.get_rect(size=(size[0] - border - pad_x * 2, size[1] - border - pad_y * 2))
+    area.center = surface.get_rect().center
+
+    surface.fill(pygame.Color(style.background_color))
+    pygame.draw.rect(surface, pygame.Color(style.border_color), surface.get_rect(), border)
+    if text:
+        font_size, lines = widgets.layout_text(text, area.size, style.font_name, style.wrap)
+        font = src.fonts.SysFont(style.font_name, font_size)
+        widgets.draw_text(surface, lines, area, font, pygame.Color(style.text_color), style.anchor)
+    return surface
+
+
+def _init_worker():
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    pygame.font.init()
+
+
+def _render_chunk(chunk, output_dir, name):
+    # Runs in the workers; returns small results (paths, or the raw pixels) so little goes back through the pipe.
+    results = []
+    for index, (text, size, style) in chunk:
+        surface = render_label(text, tuple(size), style)
+        if output_dir is None:
+            results.append((surface.get_size(), pygame.image.tobytes(surface, RAW_FORMAT)))
+        else:
+            path = os.path.join(output_dir, name.format(index))
+            pygame.image.save(surface, path)
+            results.append(path)
+    return results
+
+
+def _chunks(records, size):
+    numbered = enumerate(records)
+    while True:
+        chunk = list(itertools.islice(numbered, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def render_labels(records, output_dir=None, workers=None, name='label_{:06d}.png', chunk_size=16, max_pending=None):
+    """
+    Fits and renders a stream of labels on a pool of processes, yielding the results in the order of 'records' as
+    they're done. Only a bounded number of records is read ahead, so memory stays flat however long the stream is.
+
+    :param records: Iterable of (text, (width, height), Style).
+    :param output_dir: Directory to write PNG files to, or None to get the pixels instead.
+    :param workers: Number of processes; os.cpu_count() if None.
+    :param name: File name format, given the index of the record.
+    :param chunk_size: Records handed to a worker at a time.
+    :param max_pending: Chunks in flight at most; twice the number of workers if None.
+    :return: Iterator of file paths, or of ((width, height), RGBA bytes) if 'output_dir' is None.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    chunks = _chunks(records, chunk_size)
+    with concurrent.futures.ProcessPoolExecutor(workers, initializer=_init_worker) as pool:
+        pending = collections.deque()
+        for chunk in itertools.islice(chunks, max_pending):
+            pending.append(pool.submit(_render_chunk, chunk, output_dir, name))
+        while pending:
+            results = pending.popleft().result()
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending.append(pool.submit(_render_chunk, chunk, output_dir, name))
+            yield from results
+
+
+def read_records(file):
+    """
+    Reads records for render_labels() from JSON lines like
+    {"text": "Hello", "size": [200, 80], "style": {"font_name": "Arial", "text_color": "black", ...}}, where the
+    style holds src.widgets.Style arguments.
+    """
+    for line in file:
+        if line.strip():
+            record = json.loads(line)
+            style = record.get('style', {})
+            if 'padding' in style:
+                style['padding'] = tuple(style['padding'])
+            yield Label(record['text'], tuple(record['size']), widgets.Style(**style))
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    parser = argparse.ArgumentParser(description="Renders the labels of a JSON lines file to PNG files.")
+    parser.add_argument('records', help="JSON lines file, see read_records(); - for stdin.")
+    parser.add_argument('output_dir')
+    parser.add_argument('--workers', type=int)
+    arguments = parser.parse_args()
+
+    pygame.font.init()
+    with (sys.stdin if arguments.records == '-' else open(arguments.records)) as records_file:
+        count = sum(1 for _ in render_labels(read_records(records_file), arguments.output_dir, arguments.workers))
+    print('{} labels written to {}'.format(count, arguments.output_dir))
@@ -1,104 +1,162 @@
-from random import choice
-import pygame
-import src.event
-import src.widgets as widgets
-pygame.init()
-
-SIZE = WIDTH, HEIGHT = (1024, 720)
-FPS = 30
-NUM_WIDGETS = 16
-
-WIDGET_W = WIDTH // (NUM_WIDGETS + 1)
-X_SPACE = WIDGET_W // (NUM_WIDGETS + 1)
-WIDGET_H = HEIGHT // (NUM_WIDGETS + 1)
-Y_SPACE = WIDGET_H // (NUM_WIDGETS + 1)
-
-screen = pygame.display.set_mode(SIZE, pygame.RESIZABLE)
-clock = pygame.time.Clock()
-
-anchors = ['topleft', 'topright', 'bottomright', 'bottomleft', 'center']
-colors = tuple(pygame.color.THECOLORS.values())
-words = [
-    'Testing', 'Hello', 'Aloha', 'Programming', 'Pygame games', 'Creating widgets\nto test on',
-    'A long sentence with many breaks.\nJust for testing how it handles it.\nWe have to do it sometimes.'
-]
-font_names = pygame.font.get_fonts()
-paddings = [(x, y) for x in range(1) for y in range(1)]
-border_sizes = list(range(1, 25))
-
-
-def create_widgets(num):
-    for row in range(num):
-        for col in range(num):
-            if col % 2 == 0:
-                widgets.TextBox(
-                    pos=(WIDGET_W*col + X_SPACE*(col+1), WIDGET_H*row + Y_SPACE*(row+1)), size=(WIDGET_W, WIDGET_H),
-                    text=choice(words), font_name=choice(font_names), padding=choice(paddings), text_color=choice(colors),
-                    background_color=choice(colors), border_color=choice(colors), border_size=choice(border_sizes),
-                    anchor=choice(anchors)
-                )
-            else:
-                widgets.TextInput2(
-                    pos=(WIDGET_W*col + X_SPACE*(col+1), WIDGET_H*row + Y_SPACE*(row+1)), size=(WIDGET_W, WIDGET_H),
-                    font_name=choice(font_names), padding=choice(paddings), text_color=choice(colors),
-                    background_color=choice(colors), border_color=choice(colors), border_size=choice(border_sizes),
-                    anchor=choice(anchors)
-                )
-
-create_widgets(NUM_WIDGETS)
-pause = False
-time = 0
-pos = 0, 0
-while True:
-    dt = clock.tick(FPS) / 1000
-    time += dt
-    # if time >= 2:
-    #     for widget in widgets.all_widgets:
-    #         widget.text_color = choice(colors)
-    #     time = 0
-
-    src.event.update()
-    for event in src.event.get():
-        if event.type == pygame.QUIT:
-            quit()
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_p:
-                pause = not pause
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            if event.button == 3:
-                mouse_pos = pygame.mouse.get_pos()
-                for widget in widgets.all_widgets:
-                    if widget.rect.collidepoint(mouse_pos):
-                        print(widget)
-        elif event.type == pygame.VIDEORESIZE:
-            SIZE = WIDTH, HEIGHT = event.size
-            WIDGET_W = WIDTH // (NUM_WIDGETS + 1)
-            X_SPACE = WIDGET_W // (NUM_WIDGETS + 1)
-            WIDGET_H = HEIGHT // (NUM_WIDGETS + 1)
-            Y_SPACE = WIDGET_H // (NUM_WIDGETS + 1)
-            screen = pygame.display.set_mode(SIZE, pygame.RESIZABLE)
-            row = col = 0
-            for widget in widgets.all_widgets:
-                widget.move_to(WIDGET_W*col + X_SPACE*(col+1), WIDGET_H*row + Y_SPACE*(row+1))
-                widget.resize_to(WIDGET_W, WIDGET_H)
-                col += 1
-                if col == NUM_WIDGETS:
-                    col = 0
-                    row += 1
-
-    if pygame.mouse.get_pressed()[0]:
-        for widget in widgets.all_widgets:
-            if widget.rect.collidepoint(pygame.mouse.get_pos()) and type(widget) == type(widgets.TextBox):
-                widget.text = choice(words)
-                widget.font_name = choice(font_names)
-                widget.text_color = choice(colors)
-                widget.background_color = choice(colors)
-                widget.border_color = choice(colors)
-                widget.border_size = choice(border_sizes)
-                widget.padding = choice(paddings)
-                widget.anchor = choice(anchors)
-
-    screen.fill((0, 0, 0))
-    widgets.all_widgets.update()
-    widgets.all_widgets.draw(screen)
-    pygame.display.update()
+import argparse
+import asyncio
+import random
+from random import choice
+import numpy
+import pygame
+import src.event
+import src.fonts
+import src.stats
+import src.widgets as widgets
+from src.bindings import KeyBindings
+from src.driver import AsyncFrameDriver, FrameDriver
+from src.geometry import GeometryStore
+from src.renderer import TextureRenderer
+pygame.init()
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--record', metavar='PATH', help="Record the session, to replay with 'python -m src.replay PATH'.")
+parser.add_argument('--seed', type=int, help="Seed for the random widget setup.")
+parser.add_argument('--gpu', action='store_true', help="Draw with SDL2 textures (src.renderer) instead of blitting.")
+parser.add_argument('--asyncio', action='store_true', help="Run the frames as an asyncio task (AsyncFrameDriver).")
+parser.add_argument('--stats', metavar='PATH', help="Append render statistics (src.stats) to PATH every 10 seconds.")
+parser.add_argument('--font-backend', choices=src.fonts.BACKENDS, default='font', help="See src.fonts.set_backend().")
+parser.add_argument('--render-workers', type=int, default=4, help="Text render threads; 0 renders on the main thread.")
+arguments = parser.parse_args()
+src.fonts.set_backend(arguments.font_backend)
+seed = arguments.seed if arguments.seed is not None else random.randrange(2 ** 32)
+random.seed(seed)
+
+SIZE = WIDTH, HEIGHT = (1024, 720)
+FPS = 30
+NUM_WIDGETS = 16
+NUM_STYLES = 12
+
+WIDGET_W = WIDTH // (NUM_WIDGETS + 1)
+X_SPACE = WIDGET_W // (NUM_WIDGETS + 1)
+WIDGET_H = HEIGHT // (NUM_WIDGETS + 1)
+Y_SPACE = WIDGET_H // (NUM_WIDGETS + 1)
+
+if arguments.gpu:
+    renderer = TextureRenderer(SIZE, 'pygwig', resizable=True)
+    screen = None
+else:
+    renderer = None
+    screen = pygame.display.set_mode(SIZE, pygame.RESIZABLE)
+driver = (AsyncFrameDriver if arguments.asyncio else FrameDriver)(widgets.all_widgets, fps=FPS, renderer=renderer)
+
+anchors = ['topleft', 'topright', 'bottomright', 'bottomleft', 'center']
+colors = tuple(pygame.color.THECOLORS.values())
+words = [
+    'Testing', 'Hello', 'Aloha', 'Programming', 'Pygame games', 'Creating widgets\nto test on',
+    'A long sentence with many breaks.\nJust for testing how it handles it.\nWe have to do it sometimes.'
+]
+font_names = src.fonts.get_fonts()
+paddings = [(x, y) for x in range(1) for y in range(1)]
+border_sizes = list(range(1, 25))
+
+
+def create_widgets(num):
+    """Builds a num x num grid of TextBox and TextInput2 columns. Returns the widgets and their rows and columns."""
+    styles = [
+        widgets.Style(
+            font_name=choice(font_names), padding=choice(paddings), text_color=choice(colors),
+            background_color=choice(colors), border_color=choice(colors), border_size=choice(border_sizes),
+            anchor=choice(anchors)
+        ) for _ in range(NUM_STYLES)
+    ]
+    row, col = numpy.divmod(numpy.arange(num * num), num)
+    x, y = WIDGET_W*col + X_SPACE*(col+1), WIDGET_H*row + Y_SPACE*(row+1)
+    created, rows, cols = [], [], []
+    for cls, parity in ((widgets.TextBox, 0), (widgets.TextInput2, 1)):
+        cells = col % 2 == parity
+        count = int(cells.sum())
+        positions = numpy.stack((x[cells], y[cells]), 1)
+        texts = [choice(words) for _ in range(count)] if cls is widgets.TextBox else None
+        created += widgets.create_text_boxes(
+            [choice(styles) for _ in range(count)], positions, (WIDGET_W, WIDGET_H), texts, cls
+        )
+        rows.append(row[cells])
+        cols.append(col[cells])
+    return created, numpy.concatenate(rows), numpy.concatenate(cols)
+
+widgets.all_widgets.set_render_workers(arguments.render_workers)
+grid, grid_rows, grid_cols = create_widgets(NUM_WIDGETS)
+geometry = GeometryStore(NUM_WIDGETS * NUM_WIDGETS)
+geometry.attach(*grid)
+src.event.allow_only((
+    pygame.VIDEORESIZE, pygame.VIDEOEXPOSE, pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP,
+    pygame.MOUSEWHEEL, *widgets.KEYBOARD_EVENTS
+))
+if arguments.record:
+    # Everything the widget setup depends on besides the code, so src.replay rebuilds the same widgets.
+    src.event.record(arguments.record, {
+        'seed': seed, 'fonts': font_names, 'font_backend': arguments.font_backend,
+        'render_workers': arguments.render_workers
+    })
+stats_exporter = src.stats.Exporter(arguments.stats, widgets.all_widgets) if arguments.stats else None
+pause = False
+time = 0
+pos = 0, 0
+
+
+def toggle_pause(event):
+    global pause
+    pause = not pause
+
+
+def print_widgets_under_mouse(event):
+    for widget in geometry.collidepoint(*event.pos):
+        print(widget)
+
+
+bindings = KeyBindings()
+bindings.bind_many([
+    (pygame.QUIT, None, lambda event: quit()),
+    (pygame.KEYDOWN, pygame.K_p, toggle_pause),
+    (pygame.MOUSEBUTTONDOWN, 3, print_widgets_under_mouse, None),
+])
+
+
+def handle_frame(frame_events):
+    global SIZE, WIDTH, HEIGHT, WIDGET_W, X_SPACE, WIDGET_H, Y_SPACE, screen, time
+    dt = driver.clock.get_time() / 1000
+    time += dt
+    # if time >= 2:
+    #     for widget in widgets.all_widgets:
+    #         widget.text_color = choice(colors)
+    #     time = 0
+
+    for event in frame_events:
+        bindings.dispatch(event)
+        if event.type == pygame.VIDEORESIZE:
+            SIZE = WIDTH, HEIGHT = event.size
+            WIDGET_W = WIDTH // (NUM_WIDGETS + 1)
+            X_SPACE = WIDGET_W // (NUM_WIDGETS + 1)
+            WIDGET_H = HEIGHT // (NUM_WIDGETS + 1)
+            Y_SPACE = WIDGET_H // (NUM_WIDGETS + 1)
+            if renderer is None:
+                screen = pygame.display.set_mode(SIZE, pygame.RESIZABLE)
+            row, col = grid_rows, grid_cols
+            geometry.place(grid, WIDGET_W*col + X_SPACE*(col+1), WIDGET_H*row + Y_SPACE*(row+1), WIDGET_W, WIDGET_H)
+
+    if src.event.mouse_pressed()[0]:
+        driver.invalidate()  # Keeps shuffling while the button is held, even without mouse motion.
+        for widget in geometry.collidepoint(*src.event.mouse_pos()):
+            if type(widget) is widgets.TextBox:  # Not TextInput2, whose text is typed.
+                widget.configure(
+                    text=choice(words), font_name=choice(font_names), text_color=choice(colors),
+                    background_color=choice(colors), border_color=choice(colors), border_size=choice(border_sizes),
+                    padding=choice(paddings), anchor=choice(anchors)
+                )
+
+    if stats_exporter is not None:
+        stats_exporter.tick()
+
+
+if arguments.asyncio:
+    asyncio.run(driver.run(handle_frame))
+else:
+    while True:
+        handle_frame(driver.next_frame())
+        driver.render()
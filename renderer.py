@@ -0,0 +1,76 @@
+import weakref
+import pygame
+from pygame._sdl2 import error as SDLError, video
+
+
+class TextureRenderer:
+    """
+    Draws a WidgetManager with an SDL2 renderer instead of blitting onto the display surface. Every widget image is
+    uploaded as a texture once and only uploaded again when the widget draws onto it (see BaseWidget.image_changed);
+    widgets sharing an image, like buttons in the same state, share its texture.
+
+    Uses a hardware accelerated renderer if there is one and SDL's software renderer otherwise, e.g. on headless CI.
+    It needs a window of its own, so don't call pygame.display.set_mode() alongside it; events come through
+    pygame.event as usual.
+
+        renderer = TextureRenderer((1024, 720), resizable=True)
+        driver = FrameDriver(widgets.all_widgets, renderer=renderer)
+    """
+
+    def __init__(self, size=(640, 480), title='pygame', resizable=False, accelerated=None, vsync=False):
+        """
+        :param accelerated: True or False to require either kind of renderer; None tries hardware, then software.
+        """
+        self.window = video.Window(title, size=size, resizable=resizable)
+        self.renderer = None
+        self.accelerated = None
+        error = None
+        for candidate in ((True, False) if accelerated is None else (accelerated,)):
+            try:
+                self.renderer = video.Renderer(self.window, accelerated=int(candidate), vsync=vsync)
+            except SDLError as exception:
+                error = exception
+                continue
+            self.accelerated = candidate
+            break
+        if self.renderer is None:
+            self.window.destroy()
+            raise error
+
+        self._textures = weakref.WeakKeyDictionary()  # Image -> [texture, image version it was uploaded at].
+        self.uploads = 0
+
+    @property
+    def size(self):
+        return self.window.size
+
+    def texture(self, widget):
+        image = widget.image
+        entry = self._textures.get(image)
+        if entry is None:
+            entry = self._textures[image] = [video.Texture.from_surface(self.renderer, image), widget.image_version]
+            self.uploads += 1
+        elif entry[1] != widget.image_version:
+            entry[0].update(image)
+            entry[1] = widget.image_version
+            self.uploads += 1
+        return entry[0]
+
+    def draw(self, manager, background=(0, 0, 0)):
+        renderer = self.renderer
+        renderer.draw_color = pygame.Color(background)
+        renderer.clear()
+        for widget in manager.visible_widgets():
+            width, height = widget.image.get_size()
+            if width and height:
+                self.texture(widget).draw(dstrect=widget.rect)
+        renderer.present()
+
+    def to_surface(self):
+        """What was drawn last, as a surface; slow, for tests and screenshots."""
+        return self.renderer.to_surface()
+
+    def close(self):
+        self._textures.clear()
+        self.renderer = None
+        self.window.destroy()
@@ -0,0 +1,201 @@
+import collections
+import gzip
+import json
+import os
+import runpy
+import sys
+import time
+import pygame
+import src.event
+import src.fonts
+
+FrameTiming = collections.namedtuple('FrameTiming', 'ticks events update draw')
+
+
+class ReplayFinished(Exception):
+    pass
+
+
+def load(path):
+    """
+    Reads a recording made with src.event.record().
+
+    :return: (metadata, frames) where frames is a list of (ticks, [(event type, attributes), ...]).
+    """
+    frames = []
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        try:
+            header = json.loads(file.readline())
+        except (ValueError, OSError) as error:  # Not JSON, or not gzipped, e.g. a pickled recording of version 1.
+            raise ValueError("Unsupported recording: {}".format(error)) from error
+        version = header.get('version') if isinstance(header, dict) else None
+        if version != src.event.RECORDING_VERSION:
+            raise ValueError("Unsupported recording version: {!r}".format(version))
+        for line in file:
+            ticks, records = json.loads(line)
+            frames.append((ticks, [
+                (event_type, {key: _tuples(value) for key, value in attributes.items()})
+                for event_type, attributes in records
+            ]))
+    return header['metadata'], frames
+
+
+def _tuples(value):
+    # JSON turns the tuples of event attributes (pos, rel, buttons...) into lists.
+    return tuple(value) if isinstance(value, list) else value
+
+
+class Replay:
+    """
+    Feeds recorded frames to src.event in place of pygame's queue, one per src.event.update(), with the clock and
+    mouse state following the recording. update() raises ReplayFinished after the last frame.
+    """
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.index = -1
+        self.ticks = frames[0][0] if frames else 0
+
+    def events(self):
+        self.index += 1
+        if self.index >= len(self.frames):
+            raise ReplayFinished()
+        self.ticks, records = self.frames[self.index]
+        return [pygame.event.Event(event_type, attributes) for event_type, attributes in records]
+
+    def next_delta(self):
+        """Milliseconds until the next recorded frame; what the app's clock.tick() returned when recording."""
+        if self.index + 1 < len(self.frames):
+            return self.frames[self.index + 1][0] - self.ticks
+        return 0
+
+    def install(self):
+        src.event._source = self.events
+        src.event._clock = lambda: self.ticks
+        src.event._mouse = [(0, 0), (False, False, False)]
+
+    def uninstall(self):
+        src.event._source = pygame.event.get
+        src.event._clock = pygame.time.get_ticks
+        src.event._mouse = None
+
+
+class ReplayClock:
+    """Stands in for pygame.time.Clock: tick() returns the recorded frame time instead of sleeping."""
+
+    current = None
+
+    def __init__(self):
+        self.time = 0
+
+    def tick(self, framerate=0):
+        self.time = ReplayClock.current.next_delta()
+        return self.time
+
+    def get_time(self):
+        return self.time
+
+    def get_fps(self):
+        return 0.0
+
+
+def run(path, manager, surface, handle_events=None):
+    """
+    Replays a recording against 'manager' as fast as possible, drawing onto 'surface'.
+
+    :param handle_events: Optional callable getting each frame's events, for the app logic outside the manager.
+    :return: (metadata, list of FrameTiming) with the update and draw times in seconds.
+    """
+    metadata, frames = load(path)
+    replay = Replay(frames)
+    replay.install()
+    timings = []
+    try:
+        while True:
+            src.event.update()
+            if handle_events is not None:
+                handle_events(src.event.get())
+            start = time.perf_counter()
+            manager.update()
+            updated = time.perf_counter()
+            manager.draw(surface)
+            drawn = time.perf_counter()
+            timings.append(FrameTiming(replay.ticks, len(src.event.events), updated - start, drawn - updated))
+    except ReplayFinished:
+        pass
+    finally:
+        replay.uninstall()
+    return metadata, timings
+
+
+def report(timings):
+    lines = ['{} frames'.format(len(timings))]
+    for field in ('update', 'draw'):
+        values = sorted(getattr(timing, field) * 1000 for timing in timings)
+        if not values:
+            continue
+        lines.append('{:<6} mean {:8.3f} ms  p50 {:8.3f} ms  p95 {:8.3f} ms  max {:8.3f} ms'.format(
+            field, sum(values) / len(values), values[len(values) // 2], values[int(len(values) * 0.95)], values[-1]
+        ))
+    return '\n'.join(lines)
+
+
+def replay_main(path):
+    """
+    Runs src.main against a recording made with 'python -m src.main --record PATH', timing every frame. The widgets
+    are rebuilt from the recorded seed, font list and font backend, and rendered on the main thread, so every run of
+    a recording does the same work.
+    """
+    import src.widgets as widgets
+
+    metadata, frames = load(path)
+    replay = Replay(frames)
+    replay.install()
+    ReplayClock.current = replay
+    clock = pygame.time.Clock
+    pygame.time.Clock = ReplayClock
+
+    manager = widgets.all_widgets
+    update, draw = manager.update, manager.draw
+    timings = []
+    update_time = [0.0]
+
+    def timed_update():
+        start = time.perf_counter()
+        update()
+        update_time[0] = time.perf_counter() - start
+
+    def timed_draw(surface):
+        start = time.perf_counter()
+        dirty = draw(surface)
+        timings.append(FrameTiming(replay.ticks, len(src.event.events), update_time[0], time.perf_counter() - start))
+        return dirty
+
+    manager.update = timed_update
+    manager.draw = timed_draw
+    get_fonts = src.fonts.get_fonts
+    if 'fonts' in metadata:
+        src.fonts.get_fonts = lambda: list(metadata['fonts'])
+    sys.argv = [
+        'main.py', '--seed', str(metadata.get('seed', 0)), '--font-backend', metadata.get('font_backend', 'font'),
+        '--render-workers', '0'  # Threads would finish renders in a different frame from run to run.
+    ]
+    try:
+        runpy.run_module('src.main', run_name='__main__')
+    except (ReplayFinished, SystemExit):
+        pass
+    finally:
+        replay.uninstall()
+        pygame.time.Clock = clock
+        src.fonts.get_fonts = get_fonts
+        del manager.update, manager.draw  # Back to the methods.
+        manager.dispose()  # So the next replay starts from no widgets, like src.main does.
+    return timings
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    if len(sys.argv) != 2:
+        print('Usage: python -m src.replay RECORDING')
+        sys.exit(2)
+    print(report(replay_main(sys.argv[1])))
@@ -0,0 +1,219 @@
+import random
+
+CHUNK_SIZE = 512  # Longest text kept in one node.
+
+
+class _Node:
+
+    __slots__ = ('text', 'priority', 'left', 'right', 'size', 'newlines')
+
+    def __init__(self, text):
+        self.text = text
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.size = len(text)
+        self.newlines = text.count('\n')
+
+    def refresh(self):
+        size = len(self.text)
+        newlines = self.text.count('\n')
+        if self.left is not None:
+            size += self.left.size
+            newlines += self.left.newlines
+        if self.right is not None:
+            size += self.right.size
+            newlines += self.right.newlines
+        self.size = size
+        self.newlines = newlines
+        return self
+
+
+def _merge(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        return left.refresh()
+    right.left = _merge(left, right.left)
+    return right.refresh()
+
+
+def _split(node, offset):
+    """Splits into the nodes holding the text before 'offset' and the ones holding the rest."""
+    if node is None:
+        return None, None
+    left_size = node.left.size if node.left is not None else 0
+    if offset <= left_size:
+        left, node.left = _split(node.left, offset)
+        return left, node.refresh()
+    offset -= left_size
+    if offset >= len(node.text):
+        node.right, right = _split(node.right, offset - len(node.text))
+        return node.refresh(), right
+    # The offset falls inside this node's text; the tail becomes a node of its own.
+    tail = _Node(node.text[offset:])
+    tail.right, node.right = node.right, None
+    node.text = node.text[:offset]
+    return node.refresh(), tail.refresh()
+
+
+def _build(text):
+    """Treap of the text in CHUNK_SIZE pieces, built in linear time from a stack of the rightmost nodes."""
+    spine = []
+    for start in range(0, len(text), CHUNK_SIZE):
+        node = _Node(text[start:start + CHUNK_SIZE])
+        last = None
+        while spine and spine[-1].priority < node.priority:
+            last = spine.pop().refresh()
+        node.left = last
+        if spine:
+            spine[-1].right = node
+        spine.append(node)
+    for node in reversed(spine):
+        node.refresh()
+    return spine[0] if spine else None
+
+
+def _collect(node, start, end, parts):
+    if node is None or start >= end:
+        return
+    left_size = node.left.size if node.left is not None else 0
+    if start < left_size:
+        _collect(node.left, start, end, parts)
+    text_end = left_size + len(node.text)
+    if start < text_end and end > left_size:
+        parts.append(node.text[max(0, start - left_size):end - left_size])
+    if end > text_end:
+        _collect(node.right, start - text_end, end - text_end, parts)
+
+
+class Rope:
+    """
+    Text stored in a balanced tree (a treap) of chunks, each node knowing the length and number of newlines below it.
+    Inserting, deleting and finding lines take O(log n) whatever the size of the text, instead of copying the whole
+    string like str concatenation does.
+    """
+
+    __slots__ = ('_root',)
+
+    def __init__(self, text=''):
+        self._root = _build(text)
+
+    def __len__(self):
+        return self._root.size if self._root is not None else 0
+
+    def __str__(self):
+        return self.slice(0, len(self))
+
+    @property
+    def line_count(self):
+        return (self._root.newlines if self._root is not None else 0) + 1
+
+    def insert(self, offset, text):
+        if not text:
+            return
+        offset = max(0, min(offset, len(self)))
+        if len(text) < CHUNK_SIZE and self._insert_in_place(offset, text):
+            return
+        left, right = _split(self._root, offset)
+        self._root = _merge(_merge(left, _build(text)), right)
+
+    def _insert_in_place(self, offset, text):
+        # Typing adds to the chunk at the offset rather than making a node per keystroke.
+        path = []
+        node = self._root
+        while node is not None:
+            path.append(node)
+            left_size = node.left.size if node.left is not None else 0
+            if offset < left_size:
+                node = node.left
+            elif offset <= left_size + len(node.text):
+                if len(node.text) + len(text) > CHUNK_SIZE:
+                    return False
+                offset -= left_size
+                node.text = node.text[:offset] + text + node.text[offset:]
+                for parent in reversed(path):
+                    parent.refresh()
+                return True
+            else:
+                offset -= left_size + len(node.text)
+                node = node.right
+        return False
+
+    def delete(self, start, end):
+        start = max(0, start)
+        end = min(end, len(self))
+        if start >= end:
+            return
+        left, rest = _split(self._root, start)
+        _, right = _split(rest, end - start)
+        self._root = _merge(left, right)
+
+    def slice(self, start, end):
+        parts = []
+        _collect(self._root, max(0, start), min(end, len(self)), parts)
+        return ''.join(parts)
+
+    def line_start(self, line):
+        """Offset of the first character of the line (0-based); the end of the text past the last line."""
+        if line <= 0:
+            return 0
+        if line >= self.line_count:
+            return len(self)
+        offset = 0
+        node = self._root
+        while node is not None:
+            left_newlines = node.left.newlines if node.left is not None else 0
+            if line <= left_newlines:
+                node = node.left
+                continue
+            line -= left_newlines
+            offset += node.left.size if node.left is not None else 0
+            own = node.text.count('\n')
+            if line <= own:
+                index = -1
+                for _ in range(line):
+                    index = node.text.index('\n', index + 1)
+                return offset + index + 1
+            line -= own
+            offset += len(node.text)
+            node = node.right
+        return len(self)
+
+    def line_end(self, line):
+        """Offset of the newline ending the line, or the end of the text for the last line."""
+        if line + 1 >= self.line_count:
+            return len(self)
+        return self.line_start(line + 1) - 1
+
+    def line_of(self, offset):
+        """Line holding the offset, i.e. the number of newlines before it."""
+        line = 0
+        node = self._root
+        while node is not None:
+            left_size = node.left.size if node.left is not None else 0
+            if offset < left_size:
+                node = node.left
+                continue
+            line += node.left.newlines if node.left is not None else 0
+            offset -= left_size
+            if offset <= len(node.text):
+                return line + node.text.count('\n', 0, offset)
+            line += node.text.count('\n')
+            offset -= len(node.text)
+            node = node.right
+        return line
+
+    def line(self, line):
+        return self.slice(self.line_start(line), self.line_end(line))
+
+    def lines(self, first, count):
+        """Text of up to 'count' lines from 'first' on, fetched in one pass."""
+        first = max(0, first)
+        last = min(first + count, self.line_count)
+        if first >= last:
+            return []
+        return self.slice(self.line_start(first), self.line_end(last - 1)).split('\n')
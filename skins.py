@@ -0,0 +1,143 @@
+import collections
+import weakref
+import pygame
+import src.stats
+
+FRAME_CACHE_BYTES = 16 * 1024 * 1024  # Pixels of frames kept around, least recently used dropped first.
+
+_frames = collections.OrderedDict()  # (skin, size, background) -> surface.
+_frame_bytes = 0
+_counters = src.stats.counters
+
+
+class Skin:
+    """
+    Chrome of a widget (its background and border) at any size. frame() composites it once per size and keeps the
+    result, shared by every widget using the skin, so a widget gets its chrome with one blit and going back to a size
+    it had before costs nothing.
+    """
+
+    __slots__ = ('__weakref__',)
+
+    def frame(self, size, background=None):
+        """
+        The skin at 'size', to blit and never draw onto.
+
+        :param background: Color to put translucent skins on, making the frame opaque; None keeps the alpha.
+        """
+        global _frame_bytes
+        key = (self, (size[0], size[1]), background)
+        frame = _frames.get(key)
+        if frame is not None:
+            _frames.move_to_end(key)
+            return frame
+        frame = self.render(key[1], background)
+        _counters['surface_allocations'] += 1
+        _frames[key] = frame
+        _frame_bytes += frame.get_pitch() * frame.get_height()
+        while _frame_bytes > FRAME_CACHE_BYTES and len(_frames) > 1:
+            _, dropped = _frames.popitem(last=False)
+            _frame_bytes -= dropped.get_pitch() * dropped.get_height()
+        return frame
+
+    def render(self, size, background):
+        raise NotImplementedError
+
+
+class BorderSkin(Skin):
+    """
+    A background color with a border like pygame.draw.rect() draws, optionally rounded. Equal ones are the same object
+    (while one is in use), so widgets of the same colors share frames.
+    """
+
+    __slots__ = ('background_color', 'border_color', 'border_size', 'border_radius')
+
+    _interned = weakref.WeakValueDictionary()
+
+    def __new__(cls, background_color, border_color, border_size, border_radius=0):
+        """Colors are packed, see src.widgets.pack_color()."""
+        key = (background_color, border_color, border_size, border_radius)
+        skin = cls._interned.get(key)
+        if skin is None:
+            skin = object.__new__(cls)
+            for name, value in zip(cls.__slots__, key):
+                object.__setattr__(skin, name, value)
+            cls._interned[key] = skin
+        return skin
+
+    def __setattr__(self, name, value):
+        raise AttributeError("BorderSkin is immutable")
+
+    def render(self, size, background):
+        frame = pygame.Surface(size)
+        if self.border_radius:
+            frame.fill(pygame.Color(background if background is not None else self.background_color))
+            pygame.draw.rect(frame, pygame.Color(self.background_color), frame.get_rect(), 0, self.border_radius)
+        else:
+            frame.fill(pygame.Color(self.background_color))
+        if self.border_size:
+            pygame.draw.rect(
+                frame, pygame.Color(self.border_color), frame.get_rect(), self.border_size, self.border_radius
+            )
+        return frame
+
+
+class NineSlice(Skin):
+    """
+    An image cut in nine by 'margins' (left, top, right, bottom): the corners are kept as they are, the edges
+    stretched (or tiled) along their length and the middle to fill the rest. Make one per image and share it.
+    """
+
+    __slots__ = ('image', 'margins', 'tile')
+
+    def __init__(self, image, margins, tile=False):
+        self.image = image
+        self.margins = tuple(margins)
+        self.tile = tile
+
+    def render(self, size, background):
+        width, height = size
+        left, top, right, bottom = self.margins
+        image = self.image
+        image_width, image_height = image.get_size()
+        if background is not None:
+            frame = pygame.Surface(size)
+            frame.fill(pygame.Color(background))
+        else:
+            frame = pygame.Surface(size, pygame.SRCALPHA)
+        # Columns and rows of the slices in the image and in the frame.
+        source_x = (0, left, image_width - right, image_width)
+        source_y = (0, top, image_height - bottom, image_height)
+        target_x = (0, left, max(left, width - right), width)
+        target_y = (0, top, max(top, height - bottom), height)
+        for row in range(3):
+            for column in range(3):
+                source = pygame.Rect(
+                    source_x[column], source_y[row],
+                    source_x[column + 1] - source_x[column], source_y[row + 1] - source_y[row]
+                )
+                target = pygame.Rect(
+                    target_x[column], target_y[row],
+                    target_x[column + 1] - target_x[column], target_y[row + 1] - target_y[row]
+                )
+                if source.width <= 0 or source.height <= 0 or target.width <= 0 or target.height <= 0:
+                    continue
+                piece = image.subsurface(source)
+                if source.size == target.size:
+                    frame.blit(piece, target)
+                elif self.tile:
+                    frame.set_clip(target)
+                    for y in range(target.top, target.bottom, source.height):
+                        for x in range(target.left, target.right, source.width):
+                            frame.blit(piece, (x, y))
+                    frame.set_clip(None)
+                else:
+                    frame.blit(pygame.transform.scale(piece, target.size), target)
+        return frame
+
+
+def clear():
+    """Drops every cached frame."""
+    global _frame_bytes
+    _frames.clear()
+    _frame_bytes = 0
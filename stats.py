@@ -0,0 +1,82 @@
+import json
+import time
+
+# Work done by the widgets since the last reset(). Counted in place by the widget code, so keeping them costs a dict
+# increment; counts from render workers may very rarely miss one, as increments aren't atomic across threads.
+COUNTERS = (
+    'relayouts',  # TextBox layouts, i.e. font size and line breaks found again.
+    'fit_iterations',  # Font sizes tried by layout_text().
+    'font_constructions',  # pygame.font.Font objects made, or freetype faces loaded.
+    'text_renders',  # Strings rendered by a font, into a surface of their own or straight onto another.
+    'surface_allocations',  # Other surfaces made for widgets.
+    'blits',  # Surfaces blitted onto another, widgets drawn by a WidgetManager included.
+)
+
+counters = dict.fromkeys(COUNTERS, 0)
+
+
+def reset():
+    for name in COUNTERS:
+        counters[name] = 0
+
+
+def surface_bytes(manager):
+    """Bytes of pixels in the images of the widgets of 'manager', counting images shared by widgets once."""
+    seen = set()
+    total = 0
+    for widget in manager.sprites():
+        image = widget.image
+        if id(image) not in seen:
+            seen.add(id(image))
+            total += image.get_pitch() * image.get_height()
+    return total
+
+
+def snapshot(manager=None):
+    """
+    Copy of the counters, with 'surface_bytes' of the widgets of 'manager' if given. In tests:
+
+        before = stats.snapshot()
+        widget.text += 'a'
+        widget.update()
+        assert stats.since(before)['relayouts'] == 1
+    """
+    values = dict(counters)
+    if manager is not None:
+        values['surface_bytes'] = surface_bytes(manager)
+    return values
+
+
+def since(before):
+    """How much each counter went up since the snapshot 'before'."""
+    return {name: counters[name] - before[name] for name in COUNTERS}
+
+
+def export(path, manager=None, **extra):
+    """Appends a snapshot, the time and 'extra' as a JSON line to the file at 'path'."""
+    record = {'time': time.time()}
+    record.update(extra)
+    record.update(snapshot(manager))
+    with open(path, 'a') as file:
+        file.write(json.dumps(record) + '\n')
+
+
+class Exporter:
+    """
+    Exports a snapshot every 'interval' seconds, for monitoring; call tick() once a frame. The counters keep counting
+    from the start, so rates are the differences between lines.
+    """
+
+    __slots__ = ('path', 'manager', 'interval', '_next')
+
+    def __init__(self, path, manager=None, interval=10.0):
+        self.path = path
+        self.manager = manager
+        self.interval = interval
+        self._next = time.perf_counter() + interval
+
+    def tick(self):
+        now = time.perf_counter()
+        if now >= self._next:
+            self._next = now + self.interval
+            export(self.path, self.manager)
@@ -0,0 +1,57 @@
+import unittest
+import pygame
+from src.bindings import ANY_MODIFIER, KeyBindings
+
+
+def key_down(key, mod=0):
+    return pygame.event.Event(pygame.KEYDOWN, key=key, mod=mod)
+
+
+class KeyBindingsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()  # For key names.
+
+    def test_exact_modifiers(self):
+        bindings = KeyBindings()
+        calls = []
+        bindings.key_down(pygame.K_s, lambda event: calls.append('save'), mod=pygame.KMOD_CTRL)
+        bindings.dispatch(key_down(pygame.K_s))
+        self.assertEqual(calls, [])
+        # Either control key, with caps lock on.
+        bindings.dispatch(key_down(pygame.K_s, pygame.KMOD_RCTRL | pygame.KMOD_CAPS))
+        self.assertEqual(calls, ['save'])
+        bindings.dispatch(key_down(pygame.K_s, pygame.KMOD_CTRL | pygame.KMOD_SHIFT))
+        self.assertEqual(calls, ['save'])
+
+    def test_any_modifier(self):
+        bindings = KeyBindings()
+        calls = []
+        bindings.key_down(pygame.K_a, lambda event: calls.append('any'), mod=ANY_MODIFIER)
+        bindings.key_down(pygame.K_a, lambda event: calls.append('shift'), mod=pygame.KMOD_SHIFT, priority=1)
+        bindings.dispatch(key_down(pygame.K_a))
+        self.assertEqual(calls, ['any'])
+        del calls[:]
+        bindings.dispatch(key_down(pygame.K_a, pygame.KMOD_LSHIFT))
+        self.assertEqual(calls, ['shift', 'any'])
+
+    def test_stop_propagation_and_unbind(self):
+        bindings = KeyBindings()
+        calls = []
+
+        def first(event):
+            calls.append('first')
+            return True
+
+        bindings.key_down('x', first, priority=1)
+        bindings.key_down('x', lambda event: calls.append('second'))
+        self.assertTrue(bindings.dispatch(key_down(pygame.K_x)))
+        self.assertEqual(calls, ['first'])
+        bindings.unbind(pygame.KEYDOWN, 'x', first)
+        self.assertFalse(bindings.dispatch(key_down(pygame.K_x)))
+        self.assertEqual(calls, ['first', 'second'])
+
+
+if __name__ == '__main__':
+    unittest.main()
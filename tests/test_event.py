@@ -0,0 +1,44 @@
+import os
+import unittest
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import pygame
+import src.event
+
+
+def motion(x, y, rel):
+    return pygame.event.Event(pygame.MOUSEMOTION, pos=(x, y), rel=rel, buttons=(0, 0, 0))
+
+
+class EventTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+        pygame.display.set_mode((64, 64))
+
+    def test_coalesce(self):
+        key = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a, mod=0)
+        frame = [motion(1, 1, (1, 1)), motion(3, 2, (2, 1)), key, motion(4, 2, (1, 0)), motion(6, 5, (2, 3))]
+        coalesced = src.event._coalesce(frame)
+        self.assertEqual([event.type for event in coalesced], [pygame.MOUSEMOTION, pygame.KEYDOWN, pygame.MOUSEMOTION])
+        self.assertEqual((coalesced[0].pos, coalesced[0].rel), ((3, 2), (3, 2)))
+        self.assertEqual((coalesced[2].pos, coalesced[2].rel), ((6, 5), (3, 3)))
+
+    def test_allow_only(self):
+        pygame.event.clear()
+        try:
+            src.event.allow_only((pygame.KEYDOWN,))
+            pygame.event.post(motion(1, 1, (0, 0)))
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a, mod=0))
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+            src.event.update()
+            self.assertEqual([event.type for event in src.event.get()], [pygame.KEYDOWN, pygame.QUIT])
+        finally:
+            src.event.allow_only(None)
+        pygame.event.post(motion(1, 1, (0, 0)))
+        src.event.update()
+        self.assertEqual([event.type for event in src.event.get()], [pygame.MOUSEMOTION])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import unittest
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import pygame
+import src.event
+import src.widgets as widgets
+
+
+class FocusTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+        pygame.display.set_mode((300, 300))
+
+    def setUp(self):
+        self.manager = widgets.WidgetManager()
+        self.first = widgets.TextInput(pos=(0, 0), size=(100, 30), manager=self.manager)
+        self.label = widgets.TextBox(pos=(0, 40), size=(100, 30), text='Label', manager=self.manager)
+        self.second = widgets.TextInput2(pos=(0, 80), size=(100, 30), manager=self.manager)
+        self.button = widgets.Button(pos=(0, 120), size=(100, 30), manager=self.manager)
+        pygame.event.clear()
+        self.frame()
+
+    def tearDown(self):
+        self.manager.dispose()
+
+    def frame(self, *events):
+        for event in events:
+            pygame.event.post(event)
+        src.event.update()
+        self.manager.update()
+
+    def tab(self, mod=0):
+        self.frame(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_TAB, mod=mod, unicode='\t'))
+
+    def test_tab_order(self):
+        self.assertIsNone(self.manager.focused)
+        self.tab()
+        self.assertIs(self.manager.focused, self.first)
+        self.tab()
+        self.assertIs(self.manager.focused, self.second)  # Skips the label.
+        self.tab()
+        self.assertIs(self.manager.focused, self.button)
+        self.tab()
+        self.assertIs(self.manager.focused, self.first)
+        self.tab(pygame.KMOD_LSHIFT)
+        self.assertIs(self.manager.focused, self.button)
+        self.second.hide()
+        self.tab(pygame.KMOD_LSHIFT)
+        self.assertIs(self.manager.focused, self.first)
+
+    def test_click_and_keys(self):
+        self.frame(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=(10, 90)))
+        self.assertIs(self.manager.focused, self.second)
+        self.frame(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_h, mod=0, unicode='h'))
+        self.assertEqual(self.second.text, 'h')
+        self.assertEqual(self.first.text, [])  # Only the focused widget gets keys.
+        self.frame(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=(10, 50)))
+        self.assertIs(self.manager.focused, self.second)  # The label isn't focusable.
+        self.button.enabled = False
+        self.frame(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=(10, 130)))
+        self.assertIs(self.manager.focused, self.second)
+
+    def test_unfocused_widgets_go_idle(self):
+        self.assertFalse(self.manager.is_busy())
+        self.assertIsNone(self.manager.next_timer())
+        self.second.text = 'typed by code'
+        self.manager.update()
+        self.assertFalse(self.second.caret_shown)
+        self.assertFalse(self.manager.is_busy())
+        self.manager.focus(self.second)
+        self.assertIsNotNone(self.manager.next_timer())
+        self.manager.focus(None)
+        self.assertFalse(self.second.caret_shown)
+        self.assertIsNone(self.second.next_timer())
+
+
+if __name__ == '__main__':
+    unittest.main()
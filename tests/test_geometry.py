@@ -0,0 +1,63 @@
+import os
+import unittest
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import pygame
+import src.widgets as widgets
+from src.geometry import GeometryStore
+
+
+class GeometryStoreTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+        pygame.display.set_mode((64, 64))
+
+    def setUp(self):
+        self.manager = widgets.WidgetManager()
+
+    def tearDown(self):
+        self.manager.dispose()
+
+    def button(self, x, y, w=20, h=20):
+        return widgets.Button(pos=(x, y), size=(w, h), manager=self.manager)
+
+    def test_empty(self):
+        for capacity in (0, 4):
+            store = GeometryStore(capacity)
+            self.assertEqual(store.hit_test([(1, 1), (2, 2)]), [None, None])
+            self.assertEqual(store.collidepoint(1, 1), [])
+        store = GeometryStore(0)
+        store.attach(self.button(0, 0))
+        self.assertEqual(len(store), 1)
+
+    def test_hit_test(self):
+        bottom, top, apart = self.button(0, 0), self.button(10, 10), self.button(100, 0)
+        store = GeometryStore(2)
+        store.attach(bottom, top, apart)
+        self.assertEqual(store.hit_test([(5, 5), (15, 15), (105, 5), (50, 50)]), [bottom, top, apart, None])
+        self.assertEqual(store.collidepoint(15, 15), [bottom, top])
+        top.hide()
+        self.assertEqual(store.hit_test([(15, 15)]), [bottom])
+        store.move(50, 0)
+        self.assertEqual(store.hit_test([(55, 5)]), [bottom])
+        store.detach(bottom)
+        self.assertEqual(store.hit_test([(55, 5)]), [None])
+        self.assertEqual(bottom.rect, pygame.Rect(50, 0, 20, 20))
+
+    def test_rect_assignment(self):
+        button = self.button(0, 0)
+        store = GeometryStore()
+        store.attach(button)
+        rect = button.rect
+        rect.x = 5
+        self.assertEqual(button.rect.x, 0)  # A copy,
+        rect.width = 30
+        button.rect = rect  # until assigned back.
+        self.assertEqual(button.rect, pygame.Rect(5, 0, 30, 20))
+        self.assertEqual(button.image.get_size(), (30, 20))
+        self.assertEqual(store.hit_test([(33, 5)]), [button])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import random
+import unittest
+import src.rope
+from src.rope import Rope
+
+
+class RopeTest(unittest.TestCase):
+    """Checks Rope against a plain str going through the same random edits."""
+
+    def assert_same(self, rope, text):
+        self.assertEqual(str(rope), text)
+        self.assertEqual(len(rope), len(text))
+        lines = text.split('\n')
+        self.assertEqual(rope.line_count, len(lines))
+        for line in range(len(lines)):
+            self.assertEqual(rope.line(line), lines[line])
+        self.assertEqual(rope.lines(1, 3), lines[1:4])
+
+    def test_random_edits(self):
+        generator = random.Random(1)
+        alphabet = 'abc \n'
+        text = ''.join(generator.choice(alphabet) for _ in range(3000))
+        rope = Rope(text)
+        self.assert_same(rope, text)
+        for step in range(400):
+            start = generator.randint(0, len(text))
+            if generator.random() < 0.6:
+                size = generator.choice((1, 5, src.rope.CHUNK_SIZE + 7))
+                inserted = ''.join(generator.choice(alphabet) for _ in range(size))
+                rope.insert(start, inserted)
+                text = text[:start] + inserted + text[start:]
+            else:
+                end = start + generator.randint(0, 600)
+                rope.delete(start, end)
+                text = text[:start] + text[end:]
+            if step % 20 == 0:
+                self.assert_same(rope, text)
+            end = generator.randint(start, len(text))
+            self.assertEqual(rope.slice(start, end), text[start:end])
+        self.assert_same(rope, text)
+
+    def test_offsets_and_lines(self):
+        text = 'first\n\nthird line\nlast'
+        rope = Rope(text)
+        for offset in range(len(text) + 1):
+            line = text.count('\n', 0, offset)
+            self.assertEqual(rope.line_of(offset), line)
+            self.assertLessEqual(rope.line_start(line), offset)
+            self.assertGreaterEqual(rope.line_end(line), offset)
+        self.assertEqual(rope.line_start(99), len(text))
+
+    def test_empty(self):
+        rope = Rope()
+        self.assert_same(rope, '')
+        rope.delete(0, 10)
+        rope.insert(5, 'x')
+        self.assert_same(rope, 'x')
+
+
+if __name__ == '__main__':
+    unittest.main()
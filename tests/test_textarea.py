@@ -0,0 +1,28 @@
+import os
+import unittest
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import pygame
+import src.widgets as widgets
+
+
+class ClipboardTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+        pygame.display.set_mode((64, 64))
+
+    def test_copy_cut_paste(self):
+        # Without a usable clipboard (e.g. the dummy driver) they mustn't raise, and cut still deletes.
+        manager = widgets.WidgetManager()
+        area = widgets.TextArea(pos=(0, 0), size=(200, 100), text='hello\nworld', manager=manager)
+        area.select_all()
+        area.copy()
+        area.cut()
+        self.assertEqual(str(area.rope), '')
+        area.paste()
+        manager.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()
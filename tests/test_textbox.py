@@ -0,0 +1,99 @@
+import os
+import unittest
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import pygame
+import src.fonts
+import src.stats as stats
+import src.widgets as widgets
+
+
+class TextBoxTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+        pygame.display.set_mode((64, 64))
+
+    def setUp(self):
+        self.manager = widgets.WidgetManager()
+        self.box = widgets.TextBox(pos=(0, 0), size=(200, 60), text='Hello', manager=self.manager)
+        self.manager.update()
+
+    def tearDown(self):
+        self.manager.dispose()
+
+    def test_configure_relayouts_once(self):
+        before = stats.snapshot()
+        self.box.configure(text='Hello world', padding=(2, 2), anchor='center', text_color='red')
+        self.manager.update()
+        self.assertEqual(stats.since(before)['relayouts'], 1)
+
+    def test_text_color_only_rasterizes(self):
+        before = stats.snapshot()
+        self.box.text_color = 'red'
+        self.manager.update()
+        counts = stats.since(before)
+        self.assertEqual(counts['relayouts'], 0)
+        self.assertEqual(counts['text_renders'], 1)
+
+    def test_colors_composite_once(self):
+        version = self.box.image_version
+        self.box.background_color = 'red'
+        self.box.border_color = 'blue'
+        self.assertEqual(self.box.image_version, version)  # Waits for the update.
+        before = stats.snapshot()
+        self.manager.update()
+        self.assertEqual(self.box.image_version, version + 1)
+        self.assertEqual(stats.since(before)['text_renders'], 0)
+
+    def test_rich_text_box_fits(self):
+        runs = [widgets.Run('CPU '), widgets.Run('93%', bold=True, color='red'), widgets.Run(' load', scale=0.5)]
+        box = widgets.RichTextBox(pos=(0, 0), size=(200, 60), runs=runs, manager=self.manager)
+        self.assertGreater(box.font_size, 0)
+        before = stats.snapshot()
+        box.set_run(1, color='green')
+        self.manager.update()
+        counts = stats.since(before)
+        self.assertEqual((counts['relayouts'], counts['font_constructions'], counts['text_renders']), (0, 0, 1))
+        with self.assertRaises(ValueError):
+            box.fixed_size = 12
+
+
+class TruncationTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+        cls.font = src.fonts.SysFont('Arial', 16)
+
+    def test_ellipsize(self):
+        text = 'The quick brown fox jumps over the lazy dog'
+        width = self.font.size(text)[0] // 2
+        self.assertEqual(widgets.ellipsize(text, 10 ** 4, self.font), text)
+        for mode in widgets.ELLIPSIS_MODES:
+            short = widgets.ellipsize(text, width, self.font, mode)
+            self.assertIn(widgets.ELLIPSIS, short)
+            self.assertLessEqual(self.font.size(short)[0], width)
+        self.assertTrue(widgets.ellipsize(text, width, self.font, 'end').startswith('The'))
+        self.assertTrue(widgets.ellipsize(text, width, self.font, 'start').endswith('dog'))
+        middle = widgets.ellipsize(text, width, self.font, 'middle')
+        self.assertTrue(middle.startswith('The') and middle.endswith('dog'))
+        with self.assertRaises(ValueError):
+            widgets.ellipsize(text, width, self.font, 'nowhere')
+
+    def test_truncate_text(self):
+        text = ' '.join(['word'] * 100)
+        line_size = self.font.get_linesize()
+        size = (120, line_size * 3)
+        font_size, lines = widgets.truncate_text(text, size, 'Arial', 16)
+        self.assertEqual(font_size, 16)
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[-1].endswith(widgets.ELLIPSIS))
+        for line in lines:
+            self.assertLessEqual(self.font.size(line)[0], size[0])
+        self.assertEqual(len(widgets.truncate_text(text, size, 'Arial', 16, max_lines=2)[1]), 2)
+        self.assertEqual(widgets.truncate_text('short', size, 'Arial', 16)[1], ('short',))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,684 +1,2289 @@
-import typing
-import pygame
-import src.event
-
-# Type hints
-Vector = typing.Union[typing.Tuple[int, int], typing.List[int]]
-
-presets = []
-
-
-class WidgetManager(pygame.sprite.OrderedUpdates):
-
-    def __init__(self, *widgets):
-        super(WidgetManager, self).__init__(widgets)
-
-        self.previous_keys = None
-        self.focused = type('', (), {'update': lambda: None, 'unfocus': lambda: None})  # Temporary dummy object.
-        self._focused_index = 0
-
-    def _check_keys(self):
-        keys = pygame.key.get_pressed()
-        if keys[9] and not self.previous_keys[9]:  # 9 is tab
-            self.focused.unfocus()
-            self._focused_index = (self._focused_index + 1) % len(self)
-            self.focused = self.sprites()[self._focused_index]
-
-        self.previous_keys = keys
-
-    def _check_mouse(self):
-        if pygame.mouse.get_pressed()[0]:
-            for i, widget in enumerate(self):
-                if widget.rect.collidepoint(*pygame.mouse.get_pos()) and i != self._focused_index:
-                    self.focused.unfocus()
-                    self._focused_index = i
-                    self.focused = self.sprites()[self._focused_index]
-
-    def update(self):
-        self._check_keys()
-        self._check_mouse()
-        self.focused.update()
-        for widget in self:
-            if widget.should_update:
-                widget.update()
-
-
-class BaseWidget(pygame.sprite.Sprite):
-
-    def __init__(self, pos=(0, 0), size=(0, 0)):
-        super(BaseWidget, self).__init__()
-        self._rect = pygame.Rect(pos, size)
-        self._image = pygame.Surface(self._rect.size)
-        self.should_update = True
-
-        all_widgets.add(self)
-
-    @property
-    def rect(self):
-        return self._rect
-
-    @property
-    def image(self):
-        return self._image
-
-    def move_to(self, *pos):
-        setattr(self._rect, 'topleft', pos)
-
-    def move(self, *pos):
-        self._rect.move_ip(*pos)
-
-    def resize_to(self, *size):
-        self._rect.size = size
-        self._image = pygame.transform.scale(self._image, size)
-
-    def resize(self, *size):
-        self._rect.inflate(*size)
-        self._image = pygame.transform.scale(self._image, self._rect.size)
-
-    def unfocus(self):
-        pass
-    
-
-class Slider(BaseWidget):
-
-    def __init__(self, point_list, **kwargs):
-        super(Slider, self).__init__(**kwargs)
-
-        # Background
-        self.background = self._image.copy()
-        self.background.fill((100, 100, 100))
-
-        # Other
-        self.point_list = point_list
-        self.segment_length = self._rect.size[0] / len(point_list)
-        self.segments = len(point_list) - 1  # Reversed for easier check in 'self.move_slider()'.
-        self.pressed = False
-        self.current_value = self.point_list[0]
-
-        # Slider
-        self.slider_image = pygame.Surface((int(self.segment_length), self._rect.size[1]))
-        self.slider_image.fill((100, 255, 0))
-        self.slider = self.slider_image.get_rect(topleft=self._rect.topleft)
-        self.slider_rel_pos = (0, 0)
-
-        # Make ready
-        self.update_image()
-
-    def move_slider(self):
-        rect = self._rect
-        mouse_segment_pos = int(min(max(0, (pygame.mouse.get_pos()[0] - rect.x) / self.segment_length), self.segments))
-        self.slider.x = rect.x + mouse_segment_pos * self.segment_length
-        self.current_value = self.point_list[mouse_segment_pos]
-
-    def update_image(self):
-        self._image.blit(self.background, (0, 0))
-        self._image.blit(self.slider_image, (self.slider.x - self._rect.x, 0))  # Relative position.
-
-    def update(self):
-        if self.pressed:
-            self.move_slider()
-            self.update_image()
-
-        left_click = pygame.mouse.get_pressed()[0]
-        if left_click:
-            mouse_pos = pygame.mouse.get_pos()
-            if self.slider.collidepoint(*mouse_pos):
-                self.pressed = True
-            elif self._rect.collidepoint(*mouse_pos):
-                self.move_slider()
-                self.update_image()
-        else:
-            self.pressed = False
-
-
-class ContinuousSlider(BaseWidget):
-
-    def __init__(self, start, end, **kwargs):
-        super(ContinuousSlider, self).__init__(**kwargs)
-
-        # Background
-        self.background = self._image.copy()
-        self.background.fill((0, 0, 0))
-
-        # Other
-        self.start = start
-        self.end = end
-        self.pressed = False
-        self.current_value = start
-
-        # Slider
-        self.slider_image = pygame.Surface((self._rect.size[0] // 12, self._rect.size[1]))
-        self.slider_image.fill((100, 255, 0))
-        self.slider = self.slider_image.get_rect(topleft=self._rect.topleft)
-        self.slider_rel_pos = (0, 0)
-
-        # Make ready
-        self.update_image()
-
-    def move_slider(self):
-        rect = self._rect
-        mouse_pos = min(max(0, (pygame.mouse.get_pos()[0] - rect.x)), self._rect.width - self.slider.width)
-        self.slider.x = rect.x + mouse_pos - self.slider.width // 2
-        try:
-            self.current_value = self.start + (mouse_pos / (self._rect.width - self.slider.width)) * (self.end - self.start)
-        except ZeroDivisionError:
-            self.current_value = self.start
-
-    def update_image(self):
-        self._image.blit(self.background, (0, 0))
-        self._image.blit(self.slider_image, (self.slider.x - self._rect.x, 0))  # Relative position.
-
-    def update(self):
-        if self.pressed:
-            self.move_slider()
-            self.update_image()
-
-        left_click = pygame.mouse.get_pressed()[0]
-        if left_click:
-            mouse_pos = pygame.mouse.get_pos()
-            if self.slider.collidepoint(*mouse_pos):
-                self.pressed = True
-            elif self._rect.collidepoint(*mouse_pos):
-                self.move_slider()
-                self.update_image()
-        else:
-            self.pressed = False
-
-
-class VerticalSlider(BaseWidget):
-
-    def __init__(self, start, end, **kwargs):
-        super(VerticalSlider, self).__init__(**kwargs)
-
-        # Background
-        self.background = self._image.copy()
-        self.background.fill((100, 100, 100))
-
-        # Other
-        self.start = start
-        self.end = end
-        self.pressed = False
-        self.current_value = start
-
-        # Slider
-        self.slider_image = pygame.Surface((self._rect.size[0], self._rect.size[1] // 12))
-        self.slider_image.fill((100, 255, 0))
-        self.slider = self.slider_image.get_rect(topleft=self._rect.topleft)
-
-        # Make ready
-        self.update_image()
-
-    def move_slider(self):
-        rect = self._rect
-        mouse_pos = min(max(0, (pygame.mouse.get_pos()[1] - rect.y)), self._rect.height - self.slider.height)
-        self.slider.y = rect.y + mouse_pos
-        try:
-            self.current_value = self.start + (mouse_pos / (self._rect.height - self.slider.height)) * (self.end - self.start)
-        except ZeroDivisionError:
-            self.current_value = self.start
-
-    def update_image(self):
-        self._image.blit(self.background, (0, 0))
-        self._image.blit(self.slider_image, (0, self.slider.y - self._rect.y))  # Relative position.
-
-    def update(self):
-        if self.pressed:
-            self.move_slider()
-            self.update_image()
-
-        left_click = pygame.mouse.get_pressed()[0]
-        if left_click:
-            mouse_pos = pygame.mouse.get_pos()
-            if self.slider.collidepoint(*mouse_pos):
-                self.pressed = True
-            elif self._rect.collidepoint(*mouse_pos):
-                self.move_slider()
-                self.update_image()
-        else:
-            self.pressed = False
-
-
-class Button(BaseWidget):
-
-    def __init__(self, **kwargs):
-        super(Button, self).__init__(**kwargs)
-
-        self.color = pygame.Color(100, 0, 100)
-        self.highlight_color = pygame.Color(50, 50, 50)
-
-        self.hovered = False
-        self.is_pressed = False
-
-        self.update_image()
-
-    def update_image(self):
-        if self.is_pressed:
-            self._image.fill(self.color + self.highlight_color)
-        elif self.hovered:
-            self._image.fill(self.color)
-        else:
-            self._image.fill(self.color - self.highlight_color)
-
-    def update(self):
-        mouse_pos = pygame.mouse.get_pos()
-        previous_hovered = self.hovered
-        if self._rect.collidepoint(*mouse_pos):
-            self.hovered = True
-        else:
-            self.hovered = False
-
-        left_click = pygame.mouse.get_pressed()[0]
-        previous_pressed = self.is_pressed
-        if left_click and self.hovered:
-            self.is_pressed = True
-        elif not left_click:
-            self.is_pressed = False
-
-        if previous_hovered != self.hovered or previous_pressed != self.is_pressed:
-            self.update_image()
-
-
-class TextBox(BaseWidget):
-
-    ATTRIBUTES = [
-        'anchor', 'background_color', 'border_color', 'border_size', 'font_name', 'font_size', 'image', 'padding',
-        'rect', 'text', 'text_color', 'wrap'
-    ]
-
-    def __init__(
-            self, pos=(0, 0), size=(0, 0), text='', font_name='Arial', text_color=pygame.Color('black'),
-            anchor='topleft', padding=(0, 0), background_color=pygame.Color('white'), border_color=pygame.Color('grey'),
-            border_size=3, wrap=True
-    ) -> None:
-
-        super().__init__(pos=pos, size=size)
-        # Colors.
-        self._text_color = text_color
-        self._background_color = background_color
-        self._border_color = border_color
-
-        # Text options.
-        self._anchor = anchor
-        self._padding = padding
-        self._wrap = wrap
-
-        # Pass.
-        self._border_size = border_size  # In pixels.
-        self._text = text
-        self._font_name = font_name
-
-        # Dependent data.
-        self._text_area = self._image.get_rect(
-            size=(size[0] - border_size - padding[0] * 2, size[1] - border_size - padding[1] * 2),
-        )
-        self._text_area.center = self._image.get_rect().center
-        if text:
-            self._font_size, self._text_surface = self.get_text_surface_and_font_size()
-            self._font = pygame.font.SysFont(font_name, self._font_size)
-        else:
-            self._font_size = 256
-            self._font = pygame.font.SysFont(font_name, self._font_size)
-            self._text_surface = pygame.Surface((0, 0))
-
-        self._image.fill(background_color)
-        pygame.draw.rect(self._image, self._border_color, self._image.get_rect(), self._border_size)
-        self._image.blit(self._text_surface, self._text_area)
-
-    @property
-    def border_size(self):
-        return self._border_size
-
-    @border_size.setter
-    def border_size(self, value):
-        self._border_size = value
-        self.should_update = True
-
-    @property
-    def text(self):
-        return self._text
-
-    @text.setter
-    def text(self, value):
-        self._text = value
-        self.should_update = True
-
-    @property
-    def font_name(self):
-        return self._font_name
-
-    @font_name.setter
-    def font_name(self, value):
-        self._font_name = value
-        self.should_update = True
-
-    @property
-    def font_size(self):
-        return self._font_size
-
-    @font_size.setter
-    def font_size(self, value):
-        self._font_size = value
-        self.should_update = True
-
-    @property
-    def text_color(self):
-        return self._text_color
-
-    @text_color.setter
-    def text_color(self, value):
-        self._text_color = value
-        self.should_update = True
-
-    @property
-    def background_color(self):
-        return self._background_color
-
-    @background_color.setter
-    def background_color(self, background_color):
-        self._background_color = background_color
-
-        self._image.fill(background_color)
-        pygame.draw.rect(self._image, self._border_color, self._image.get_rect(), self._border_size)
-        self._image.blit(self._text_surface, self._text_area)
-
-    @property
-    def border_color(self):
-        return self._border_color
-
-    @border_color.setter
-    def border_color(self, border_color):
-        self._border_color = border_color
-
-        self._image.fill(self._background_color)
-        pygame.draw.rect(self._image, border_color, self._image.get_rect(), self._border_size)
-        self._image.blit(self._text_surface, self._text_area)
-
-    @property
-    def anchor(self):
-        return self._anchor
-
-    @anchor.setter
-    def anchor(self, value):
-        self._anchor = value
-        self.should_update = True
-
-    @property
-    def padding(self):
-        return self._padding
-
-    @padding.setter
-    def padding(self, value):
-        self._padding = value
-        self.should_update = True
-
-    def get_text_surface_and_font_size(self, font_size=256):
-        size = self._text_area.size
-        font_name = self._font_name
-        font_color = self._text_color
-        bg_color = self._background_color
-        wrap = self._wrap
-        text_array = [word.split() for word in self._text.splitlines()]
-        SysFont = pygame.font.SysFont
-
-        rows = len(text_array)
-        appendable_rows = []
-        width, height = size
-        lower, upper = 0, font_size
-        found = False
-        while not found:
-            font = SysFont(font_name, font_size)
-            font_sizes = tuple(font.size(' '.join(row)) for row in text_array)  # Font size (width, height) of each row.
-            text_width = max(size[0] for size in font_sizes)
-            text_height = font_sizes[0][1] * rows
-
-            if wrap:
-                # The surface cannot fit an exact font size so we'll return the lower of the two.
-                if upper - lower <= 1:
-                    found = True
-                # Width exceed but height will fit one extra row.
-                elif text_width > width and text_height + text_height // rows <= height:
-                    for row, x in enumerate(font_sizes):
-                        if x[0] == text_width:
-                            if len(text_array[row]) > 1:
-                                if row + 1 in appendable_rows:
-                                    word = text_array[row].pop()
-                                    text_array[row + 1].insert(0, word)
-                                else:
-                                    word = text_array[row].pop()
-                                    text_array.insert(row + 1, [word])
-                                    appendable_rows.append(row + 1)
-                                    rows += 1
-                            else:
-                                upper = font_size
-                                font_size = (lower + upper) // 2
-                            break
-                elif text_width > width or text_height > height:
-                    upper = font_size
-                    font_size = (lower + upper) // 2
-                elif text_width < width and text_height < height:
-                    lower = font_size
-                    font_size = (lower + upper) // 2
-                else:
-                    found = True
-            else:
-                # The surface cannot fit an exact font size so we'll return the lower of the two.
-                if font_size == lower or font_size == upper:
-                    found = True
-                elif text_width < width and text_height < height:
-                    lower = font_size
-                    font_size = (lower + upper) // 2
-                elif text_width > width or text_height > height:
-                    upper = font_size
-                    font_size = (lower + upper) // 2
-                else:
-                    found = True
-
-        return_surface = pygame.Surface(size)
-        return_surface.fill(bg_color)
-        h = height // rows
-        for row, text_row in enumerate(text_array):
-            sub_surface = pygame.font.SysFont(font_name, lower).render(' '.join(text_row), 1, font_color)
-            rect = self._text_area.copy()
-            rect.height = h
-            rect.topleft = (0, h * row)
-            pos = sub_surface.get_rect()
-            setattr(pos, self._anchor, getattr(rect, self._anchor))
-            return_surface.blit(sub_surface, pos)
-
-        return lower, return_surface
-
-    # def _update_text_area(self):
-    #     text_array = [word.split() for word in self._text.splitlines()]
-    #     rows = len(text_array)
-    #     height = self._text_area.height
-    #
-    #     h = height // rows
-    #     for row, text_row in enumerate(text_array):
-    #         sub_surface = self._font.render(' '.join(text_row), 1, self._text_color)
-    #         rect = self._text_area.copy()
-    #         rect.height = h
-    #         rect.topleft = (0, h * row)
-    #         pos = sub_surface.get_rect()
-    #         setattr(pos, self._anchor, getattr(rect, self._anchor))
-    #         self._text_surface.blit(sub_surface, pos)
-    #     self._image.blit(self._text_surface, self._text_area)
-
-    def update(self):
-        if self.should_update:
-            # update_whole_image
-            self._text_area = self._image.get_rect(
-                size=(self._rect.size[0] - self._border_size - self._padding[0] * 2,
-                      self._rect.size[1] - self._border_size - self._padding[1] * 2)
-            )
-            self._text_area.center = self._image.get_rect().center
-            if self._text:
-                self._font_size, self._text_surface = self.get_text_surface_and_font_size()
-                self._font = pygame.font.SysFont(self._font_name, self._font_size)
-            else:
-                self._font_size = 1
-                self._font = pygame.font.SysFont(self._font_name, self._font_size)
-                self._text_surface = pygame.Surface((0, 0))
-
-            self._image.fill(self._background_color)
-            pygame.draw.rect(self._image, self._border_color, self._image.get_rect(), self._border_size)
-            self._image.blit(self._text_surface, self._text_area)
-
-            self.should_update = False
-
-    def __repr__(self):
-        attributes = sorted(self.ATTRIBUTES)
-        values = []
-        for attribute in attributes:
-            if attribute in self.__dict__:
-                values.append(getattr(self, attribute))
-            else:
-                values.append(getattr(self, '_' + attribute))
-
-        return '{}: \n{}\n'.format(
-            self.__class__.__name__, '\n'.join('\t{} = {!r}'.format(name, value) for name, value in zip(attributes, values))
-        )
-
-
-class TextInput(BaseWidget):
-
-    VALID_CHARS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890,.+-,'
-
-    def __init__(self, **kwargs):
-        """
-        Limitations: only 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890,.+-' and shift, tab,
-                     return are supported.
-        :param size:
-        :param pos:
-        """
-        super(TextInput, self).__init__(**kwargs)
-        self.size = self._rect.size
-
-        self.color = {
-            "text": pygame.Color("black"),
-            "border": pygame.Color("dark grey"),
-            "border_focused": pygame.Color("light grey"),
-            "background": pygame.Color("white")
-        }
-
-        self._image.fill(self.color["background"])
-        self.previous_keys = pygame.key.get_pressed()
-        self.font = pygame.font.SysFont("Arial", 4 * self.size[1] // 5)
-        self.text = []
-        self.text_image = pygame.Surface(self.size)
-
-        self.command_chars = {"backspace": self.backspace}
-
-        self.caret = pygame.Rect((4, 2), (1, self.size[1] - 5))
-        self.caret_time = pygame.time.get_ticks()
-        self.caret_shown = True
-
-    def backspace(self):
-        try:
-            self.text.pop(-1)
-            self._image.fill(self.color["background"])
-        except IndexError:
-            pass
-
-    def update_image(self):
-        self.text_image = self.font.render("".join(self.text), 1, self.color["text"], self.color["background"])
-        self._image.blit(self.text_image, (4, (self.size[1] - self.text_image.get_height()) // 2))
-        pygame.draw.rect(self._image, self.color['border'], self._image.get_rect(topleft=(-1, -1)), 4)
-        if self.caret_shown:
-            self.caret.left = self.text_image.get_rect().right + 4
-            pygame.draw.rect(self._image, (0, 0, 0), self.caret)
-        else:
-            pygame.draw.rect(self._image, self.color["background"], self.caret)
-
-    def update(self):
-        update_image = False
-        keys = pygame.key.get_pressed()
-        shift_pressed = keys[303] or keys[304] or keys[301]  # 303 is right shift. 304 is left shift. 301 is caps lock.
-        for key, is_pressed in enumerate(keys):
-            if is_pressed:
-                print(key, pygame.key.name(key), self.previous_keys[key])
-            if is_pressed and not self.previous_keys[key]:
-                character = pygame.key.name(key)
-                if shift_pressed:
-                    try:
-                        character = character.capitalize()
-                        update_image = True
-                    except ValueError:
-                        pass
-                if character in self.VALID_CHARS:
-                    self.text.append(character)
-                    update_image = True
-                elif character in self.command_chars:
-                    self.command_chars[character]()
-                    update_image = True
-                elif character == 'space':
-                    self.text.append(' ')
-                    update_image = True
-
-        self.previous_keys = keys
-        if update_image:
-            self.update_image()
-
-        if pygame.time.get_ticks() - self.caret_time >= 500:
-            self.caret_shown = not self.caret_shown
-            self.caret_time = pygame.time.get_ticks()
-            self.update_image()
-
-    def unfocus(self):
-        self.caret_shown = False
-        self.update_image()
-        pygame.draw.rect(self._image, self.color['background'], self._image.get_rect(topleft=(-1, -1)), 4)
-
-
-class TextInput2(TextBox):
-
-    def __init__(self, **kwargs):
-        """
-        Limitations: only 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890,.+-' and shift, tab,
-                     return are supported.
-        :param size:
-        :param pos:
-        """
-        super(TextInput2, self).__init__(**kwargs)
-
-        self.command_chars = {"backspace": self.backspace}
-
-        self.caret = pygame.Rect(self._text_area.topleft, (self._rect.width // 50, self._text_area.height - 4))
-        self.caret_time = pygame.time.get_ticks()
-        self.caret_shown = False
-
-    def backspace(self):
-        self._text = self.text[:-1]
-        self.should_update = True
-
-    def update(self):
-        for event in src.event.get(pygame.KEYDOWN):
-            if event.key == pygame.K_BACKSPACE:
-                self.backspace()
-            else:
-                self.text += event.unicode
-
-        if pygame.time.get_ticks() - self.caret_time >= 500:
-            self.caret_shown = not self.caret_shown
-            self.caret_time = pygame.time.get_ticks()
-            self.should_update = True
-
-        if self.should_update:
-            super(TextInput2, self).update()
-            if self.caret_shown:
-                if self._text:
-                    rows = tuple(filter(None, self._text.split('\r')))
-                    caret_height = self._font.size(rows[0])[1]
-                    word_width = self._font.size(rows[-1])[0]
-                    self.caret.left = self._text_area.left + word_width
-                    self.caret.height = caret_height
-                    self.caret.bottom = caret_height * len(rows) + self._border_size
-                else:
-                    self.caret.left = self._text_area.left
-                pygame.draw.rect(self._image, (0, 0, 0), self.caret)
-        self.should_update = False
-
-    def unfocus(self):
-        self.caret_shown = False
-        super(TextInput2, self).unfocus()
-
-all_widgets = WidgetManager()
+import bisect
+import collections
+import concurrent.futures
+import contextlib
+import itertools
+import re
+import typing
+import weakref
+import pygame
+import src.event
+import src.fonts
+import src.rope
+import src.skins
+import src.stats
+
+# Type hints
+Vector = typing.Union[typing.Tuple[int, int], typing.List[int]]
+
+presets = []
+
+KEYBOARD_EVENTS = frozenset((pygame.KEYDOWN, pygame.KEYUP, pygame.TEXTINPUT, pygame.TEXTEDITING))
+MOUSE_EVENTS = frozenset((pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP))
+
+EMPTY_SURFACE = pygame.Surface((0, 0))  # Image of disposed widgets; never drawn onto.
+
+# TextBox invalidation levels, see TextBox._invalidate().
+CLEAN, COMPOSITE, RASTERIZE, LAYOUT = range(4)
+
+_deferred_repaints = {}  # Widgets inside a batch() -> whether a setter asked for a repaint.
+_managers = weakref.WeakSet()  # Every WidgetManager, for batch().
+_shared_renders = None  # (layouts, line images) by their arguments while create_text_boxes() runs.
+_counters = src.stats.counters
+
+
+class WidgetManager(pygame.sprite.RenderUpdates):
+    """
+    Group of widgets drawn in order of addition. Hidden widgets stay in the group, but aren't updated, drawn, focused
+    or hit by widget_at(); hiding and showing them is O(1) and keeps their images.
+    """
+
+    def __init__(self, *widgets, render_workers=0):
+        _managers.add(self)
+        self.focused = None
+        self._visible = {}  # Visible widgets (as keys) in drawing order, once sorted.
+        self._visible_sorted = True
+        super(WidgetManager, self).__init__(widgets)
+
+        # Text fitting/rendering handed to worker threads. Maps widget -> future of its latest request.
+        self.render_pool = None
+        self._pending_renders = {}
+        self.set_render_workers(render_workers)
+
+    def set_render_workers(self, workers):
+        """
+        Hands text fitting and rendering of the widgets to a pool of 'workers' threads (pygame's font and surface
+        operations release the GIL). Widgets keep showing their previous image until the new one is ready. 0 renders
+        on the main thread.
+        """
+        if self.render_pool is not None:
+            self.render_pool.shutdown(wait=True)
+            self._finish_renders()
+        self.render_pool = concurrent.futures.ThreadPoolExecutor(workers) if workers else None
+
+    def submit_render(self, widget, function, *args):
+        future = self._pending_renders.get(widget)
+        if future is not None:
+            future.cancel()  # Superseded; if it's already running its result is simply dropped.
+        self._pending_renders[widget] = self.render_pool.submit(function, *args)
+
+    def is_rendering(self, widget):
+        return widget in self._pending_renders
+
+    def cancel_render(self, widget):
+        future = self._pending_renders.pop(widget, None)
+        if future is not None:
+            future.cancel()
+
+    def _finish_renders(self):
+        # Swap in every finished image at the start of the frame, so a widget never shows a half updated state.
+        if not self._pending_renders:
+            return
+        for widget, future in tuple(self._pending_renders.items()):
+            if future.done():
+                del self._pending_renders[widget]
+                if not future.cancelled():
+                    widget.finish_render(*future.result())
+
+    def add_internal(self, sprite, layer=None):
+        super(WidgetManager, self).add_internal(sprite)
+        sprite._manager = self
+        if sprite.visible:
+            self._visible[sprite] = None  # Newest, so the order holds.
+
+    def remove_internal(self, sprite):
+        if sprite is self.focused:
+            self.focus(None)
+        super(WidgetManager, self).remove_internal(sprite)
+        self._visible.pop(sprite, None)
+        self.cancel_render(sprite)
+        if getattr(sprite, '_manager', None) is self:
+            sprite._manager = None
+
+    def sprites(self):
+        return list(self.spritedict)  # Keeps the order of addition.
+
+    def visible_widgets(self):
+        """The visible widgets, bottom to top."""
+        if not self._visible_sorted:
+            # Shown widgets were appended; put them back in their place once, rather than on every show().
+            self._visible = dict.fromkeys(widget for widget in self.spritedict if widget in self._visible)
+            self._visible_sorted = True
+        return list(self._visible)
+
+    def set_visible(self, widget, visible):
+        """Called by BaseWidget.show() and hide()."""
+        if visible:
+            if widget not in self._visible:
+                self._visible[widget] = None
+                self._visible_sorted = False
+        elif self._visible.pop(widget, 0) is None:
+            if widget is self.focused:
+                self.focus(None)
+            rect = self.spritedict[widget]
+            if rect:
+                self.lostsprites.append(rect)  # So the area gets redrawn by dirty rect updates.
+            self.spritedict[widget] = 0
+
+    def draw(self, surface, bgsurf=None, special_flags=0):
+        surface_blit = surface.blit
+        dirty = self.lostsprites
+        self.lostsprites = []
+        dirty_append = dirty.append
+        visible = self.visible_widgets()
+        _counters['blits'] += len(visible)
+        for sprite in visible:
+            old_rect = self.spritedict[sprite]
+            new_rect = surface_blit(sprite.image, sprite.rect, None, special_flags)
+            if old_rect:
+                if new_rect.colliderect(old_rect):
+                    dirty_append(new_rect.union(old_rect))
+                else:
+                    dirty_append(new_rect)
+                    dirty_append(old_rect)
+            else:
+                dirty_append(new_rect)
+            self.spritedict[sprite] = new_rect
+        return dirty
+
+    def dispose(self):
+        """Disposes of every widget and stops the render workers, e.g. when leaving a screen for good."""
+        self.focus(None)
+        for widget in self.sprites():
+            widget.dispose()
+        if self.render_pool is not None:
+            self.render_pool.shutdown(wait=False, cancel_futures=True)
+            self.render_pool = None
+        self._pending_renders.clear()
+        self.lostsprites = []
+
+    def focus(self, widget):
+        """Gives 'widget' (or nothing, if None) the keyboard focus."""
+        if widget is self.focused:
+            return
+        previous = self.focused
+        if previous is not None:
+            previous.unfocus()
+        self.focused = widget
+        if previous is not None and previous.text_input and (widget is None or not widget.text_input):
+            pygame.key.stop_text_input()  # Closes the input method and on-screen keyboard.
+        if widget is not None:
+            widget.focus()
+
+    def focus_next(self, step=1):
+        focusable = [widget for widget in self.visible_widgets() if widget.focusable and widget.enabled]
+        if not focusable:
+            return
+        if self.focused in focusable:
+            self.focus(focusable[(focusable.index(self.focused) + step) % len(focusable)])
+        else:
+            self.focus(focusable[0 if step > 0 else -1])
+
+    def widget_at(self, pos):
+        """The topmost widget at 'pos', or None."""
+        for widget in reversed(self.visible_widgets()):
+            if widget.rect.collidepoint(pos):
+                return widget
+        return None
+
+    def _route_events(self):
+        # Tab and clicks move the focus; keyboard and text events only go to the focused widget. Mouse input gets
+        # the widgets following the mouse updated.
+        mouse_moved = False
+        for event in src.event.get():
+            if event.type in KEYBOARD_EVENTS:
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_TAB:
+                    self.focus_next(-1 if event.mod & pygame.KMOD_SHIFT else 1)
+                elif self.focused is not None:
+                    self.focused.handle_event(event)
+            elif event.type in MOUSE_EVENTS:
+                mouse_moved = True
+                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    widget = self.widget_at(event.pos)
+                    if widget is not None and widget.focusable and widget.enabled:
+                        self.focus(widget)
+        if mouse_moved:
+            for widget in self._visible:
+                if widget.follows_mouse:
+                    widget.should_update = True
+
+    def is_busy(self):
+        """Whether a widget needs updating or a render is pending, i.e. the next frame can't wait for input."""
+        return bool(self._pending_renders) or any(widget.should_update for widget in self._visible)
+
+    def next_timer(self):
+        """
+        Tick time (see src.event.get_ticks) at which a widget wants updating without any input, e.g. a caret blink,
+        or None. Only the focused widget is updated every frame, so it's the only one that can have a timer.
+        """
+        return self.focused.next_timer() if self.focused is not None else None
+
+    def update(self):
+        for _ in self.update_steps():
+            pass
+
+    def update_steps(self):
+        """update(), yielding after every widget updated, so the work can be spread out (see AsyncFrameDriver)."""
+        self._finish_renders()
+        self._route_events()
+        if self.focused is not None:
+            self.focused.update()
+            yield
+        for widget in self.visible_widgets():
+            if widget.should_update:
+                widget.update()
+                yield
+
+
+def pack_color(color):
+    """Colors are stored on widgets as 0xRRGGBBAA ints instead of a pygame.Color object each."""
+    return int(pygame.Color(color))
+
+
+@contextlib.contextmanager
+def batch(*widgets):
+    """
+    Holds back the repaints the widgets' setters do until the end of the block, then repaints each widget once. Without
+    widgets, covers the widgets of every WidgetManager, e.g. for a theme change:
+
+        with batch():
+            for widget in all_widgets:
+                widget.background_color = background
+                widget.text_color = foreground
+    """
+    if not widgets:
+        widgets = [widget for manager in tuple(_managers) for widget in manager.sprites()]
+    widgets = [widget for widget in widgets if widget not in _deferred_repaints]
+    for widget in widgets:
+        _deferred_repaints[widget] = False
+    try:
+        yield
+    finally:
+        for widget in widgets:
+            if _deferred_repaints.pop(widget):
+                widget.repaint()
+
+
+class BaseWidget:
+    """
+    Implements the parts of the pygame.sprite.Sprite protocol the groups use, but with __slots__ (Sprite gives every
+    instance a __dict__ and a set of groups). Subclasses should declare __slots__ for their attributes too.
+    """
+
+    __slots__ = (
+        '_rect', '_image', 'image_version', 'should_update', '_manager', '_groups', '_geometry', '_index', '_visible',
+        '_enabled', '_layer', '__weakref__'
+    )
+
+    focusable = True  # Whether Tab and clicks give the widget the keyboard focus.
+    text_input = False  # Whether the widget takes text (and SDL text input, e.g. an IME, has to stay on) while focused.
+    follows_mouse = False  # Whether the manager updates the widget on mouse motion and buttons.
+
+    def __init__(self, pos=(0, 0), size=(0, 0), manager=None):
+        """
+        :param manager: WidgetManager (e.g. one per screen) the widget belongs to; all_widgets if None.
+        """
+        self._groups = ()
+        self._visible = True
+        self._enabled = True
+        self._layer = 0  # For pygame.sprite.LayeredUpdates, like Sprite.layer.
+        self._geometry = None  # GeometryStore holding the rect instead of _rect, if any.
+        self._index = -1
+        self._rect = pygame.Rect(pos, size)
+        self._image = pygame.Surface(self._rect.size)
+        _counters['surface_allocations'] += 1
+        self.image_version = 0  # Counts in place changes of the image, see image_changed().
+        self.should_update = True
+        self._manager = None
+
+        (manager if manager is not None else all_widgets).add(self)
+
+    def add_internal(self, group):
+        self._groups += (group,)
+
+    def remove_internal(self, group):
+        self._groups = tuple(x for x in self._groups if x is not group)
+
+    def add(self, *groups):
+        for group in groups:
+            if group not in self._groups:
+                group.add(self)
+
+    def remove(self, *groups):
+        for group in groups:
+            if group in self._groups:
+                group.remove(self)
+
+    def groups(self):
+        return list(self._groups)
+
+    @property
+    def layer(self):
+        return self._layer
+
+    @layer.setter
+    def layer(self, value):
+        if self._groups:
+            raise AttributeError("Can't set layer directly after adding to group")
+        self._layer = value
+
+    def alive(self):
+        return bool(self._groups)
+
+    def kill(self):
+        for group in self._groups:
+            group.remove_internal(self)
+        self._groups = ()
+
+    def update(self, *args, **kwargs):
+        pass
+
+    def next_timer(self):
+        """Tick time at which the widget wants to be updated even if nothing happens, or None."""
+        return None
+
+    @property
+    def rect(self):
+        """
+        The widget's pygame.Rect. For a widget attached to a GeometryStore it's a copy built from the store, so changes
+        to it only take effect when it's assigned back: 'rect = widget.rect; rect.x = 5; widget.rect = rect'.
+        """
+        if self._geometry is None:
+            return self._rect
+        return self._geometry.rect(self._index)
+
+    @rect.setter
+    def rect(self, value):
+        value = pygame.Rect(value)
+        resized = value.size != self.rect.size
+        if self._geometry is None:
+            self._rect = value
+        else:
+            self._geometry.set_topleft(self._index, *value.topleft)
+            self._geometry.set_size(self._index, *value.size)
+        if resized:
+            self.resize_image()
+
+    @property
+    def image(self):
+        return self._image
+
+    def image_changed(self):
+        """
+        To call after drawing onto the image in place, so copies of it (like textures of src.renderer) get updated.
+        Replacing the image with another surface doesn't need it.
+        """
+        self.image_version += 1
+
+    @property
+    def visible(self):
+        return self._visible
+
+    def show(self):
+        self._set_visible(True)
+
+    def hide(self):
+        """Takes the widget out of updates, drawing and hit-tests until show(), keeping its image."""
+        self._set_visible(False)
+
+    def _set_visible(self, visible):
+        if visible == self._visible:
+            return
+        self._visible = visible
+        if self._manager is not None:
+            self._manager.set_visible(self, visible)
+        if self._geometry is not None:
+            self._geometry.set_visible(self._index, visible)
+
+    @property
+    def enabled(self):
+        """Disabled widgets are still drawn, but don't react to input or take the focus."""
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value):
+        self._enabled = value
+        if not value and self._manager is not None and self._manager.focused is self:
+            self._manager.focus(None)
+        self.request_repaint()
+
+    def move_to(self, *pos):
+        if self._geometry is None:
+            setattr(self._rect, 'topleft', pos)
+        else:
+            self._geometry.set_topleft(self._index, *pos)
+
+    def move(self, *pos):
+        if self._geometry is None:
+            self._rect.move_ip(*pos)
+        else:
+            self._geometry.set_topleft(self._index, *self.rect.move(*pos).topleft)
+
+    def resize_to(self, *size):
+        if self._geometry is None:
+            self._rect.size = size
+        else:
+            self._geometry.set_size(self._index, *size)
+        self.resize_image()
+
+    def resize(self, *size):
+        self.rect.inflate(*size)
+        self.resize_image()
+
+    def resize_image(self):
+        self._image = pygame.transform.scale(self._image, self.rect.size)
+
+    @property
+    def has_focus(self):
+        """Whether the widget's manager gives it the keyboard focus."""
+        return self._manager is not None and self._manager.focused is self
+
+    def focus(self):
+        pass
+
+    def unfocus(self):
+        pass
+
+    def handle_event(self, event):
+        """Gets the keyboard and text events while the widget has the focus."""
+        pass
+
+    def configure(self, **properties):
+        """Sets several properties with a single repaint or relayout, instead of one per property."""
+        with batch(self):
+            for name, value in properties.items():
+                setattr(self, name, value)
+
+    def request_repaint(self):
+        """Repaints now, or when the batch() the widget is in ends."""
+        if self in _deferred_repaints:
+            _deferred_repaints[self] = True
+        else:
+            self.repaint()
+
+    def repaint(self):
+        """Redraws the image from the current state, without laying anything out again."""
+        pass
+
+    def dispose(self):
+        """
+        Takes the widget out of its groups and geometry store and lets go of its surfaces, for a widget that won't be
+        used again. Subclasses drop their own surfaces and caches too.
+        """
+        self.kill()
+        if self._geometry is not None:
+            self._geometry.detach(self)
+        self._image = EMPTY_SURFACE
+    
+
+class Slider(BaseWidget):
+
+    __slots__ = (
+        'background', 'point_list', 'segment_length', 'segments', 'pressed', 'current_value', 'slider_image', 'slider',
+        'slider_rel_pos'
+    )
+
+    follows_mouse = True
+
+    def __init__(self, point_list, **kwargs):
+        super(Slider, self).__init__(**kwargs)
+
+        # Background
+        self.background = self._image.copy()
+        _counters['surface_allocations'] += 2  # With the slider image.
+        self.background.fill((100, 100, 100))
+
+        # Other
+        self.point_list = point_list
+        self.segment_length = self.rect.size[0] / len(point_list)
+        self.segments = len(point_list) - 1  # Reversed for easier check in 'self.move_slider()'.
+        self.pressed = False
+        self.current_value = self.point_list[0]
+
+        # Slider
+        self.slider_image = pygame.Surface((int(self.segment_length), self.rect.size[1]))
+        self.slider_image.fill((100, 255, 0))
+        self.slider = self.slider_image.get_rect(topleft=self.rect.topleft)
+        self.slider_rel_pos = (0, 0)
+
+        # Make ready
+        self.update_image()
+
+    def dispose(self):
+        super().dispose()
+        self.background = self.slider_image = None
+
+    def move_slider(self):
+        rect = self.rect
+        mouse_segment_pos = int(min(max(0, (src.event.mouse_pos()[0] - rect.x) / self.segment_length), self.segments))
+        self.slider.x = rect.x + mouse_segment_pos * self.segment_length
+        self.current_value = self.point_list[mouse_segment_pos]
+
+    def update_image(self):
+        _counters['blits'] += 2
+        self._image.blit(self.background, (0, 0))
+        self._image.blit(self.slider_image, (self.slider.x - self.rect.x, 0))  # Relative position.
+        self.image_changed()
+
+    def update(self):
+        self.should_update = False  # Until the next mouse event.
+        if not self._enabled:
+            self.pressed = False
+            return
+        if self.pressed:
+            self.move_slider()
+            self.update_image()
+
+        left_click = src.event.mouse_pressed()[0]
+        if left_click:
+            mouse_pos = src.event.mouse_pos()
+            if self.slider.collidepoint(*mouse_pos):
+                self.pressed = True
+            elif self.rect.collidepoint(*mouse_pos):
+                self.move_slider()
+                self.update_image()
+        else:
+            self.pressed = False
+
+
+class ContinuousSlider(BaseWidget):
+
+    __slots__ = ('background', 'start', 'end', 'pressed', 'current_value', 'slider_image', 'slider', 'slider_rel_pos')
+
+    follows_mouse = True
+
+    def __init__(self, start, end, **kwargs):
+        super(ContinuousSlider, self).__init__(**kwargs)
+
+        # Background
+        self.background = self._image.copy()
+        _counters['surface_allocations'] += 2  # With the slider image.
+        self.background.fill((0, 0, 0))
+
+        # Other
+        self.start = start
+        self.end = end
+        self.pressed = False
+        self.current_value = start
+
+        # Slider
+        self.slider_image = pygame.Surface((self.rect.size[0] // 12, self.rect.size[1]))
+        self.slider_image.fill((100, 255, 0))
+        self.slider = self.slider_image.get_rect(topleft=self.rect.topleft)
+        self.slider_rel_pos = (0, 0)
+
+        # Make ready
+        self.update_image()
+
+    def dispose(self):
+        super().dispose()
+        self.background = self.slider_image = None
+
+    def move_slider(self):
+        rect = self.rect
+        mouse_pos = min(max(0, (src.event.mouse_pos()[0] - rect.x)), self.rect.width - self.slider.width)
+        self.slider.x = rect.x + mouse_pos - self.slider.width // 2
+        try:
+            self.current_value = self.start + (mouse_pos / (self.rect.width - self.slider.width)) * (self.end - self.start)
+        except ZeroDivisionError:
+            self.current_value = self.start
+
+    def update_image(self):
+        _counters['blits'] += 2
+        self._image.blit(self.background, (0, 0))
+        self._image.blit(self.slider_image, (self.slider.x - self.rect.x, 0))  # Relative position.
+        self.image_changed()
+
+    def update(self):
+        self.should_update = False  # Until the next mouse event.
+        if not self._enabled:
+            self.pressed = False
+            return
+        if self.pressed:
+            self.move_slider()
+            self.update_image()
+
+        left_click = src.event.mouse_pressed()[0]
+        if left_click:
+            mouse_pos = src.event.mouse_pos()
+            if self.slider.collidepoint(*mouse_pos):
+                self.pressed = True
+            elif self.rect.collidepoint(*mouse_pos):
+                self.move_slider()
+                self.update_image()
+        else:
+            self.pressed = False
+
+
+class VerticalSlider(BaseWidget):
+
+    __slots__ = ('background', 'start', 'end', 'pressed', 'current_value', 'slider_image', 'slider')
+
+    follows_mouse = True
+
+    def __init__(self, start, end, **kwargs):
+        super(VerticalSlider, self).__init__(**kwargs)
+
+        # Background
+        self.background = self._image.copy()
+        _counters['surface_allocations'] += 2  # With the slider image.
+        self.background.fill((100, 100, 100))
+
+        # Other
+        self.start = start
+        self.end = end
+        self.pressed = False
+        self.current_value = start
+
+        # Slider
+        self.slider_image = pygame.Surface((self.rect.size[0], self.rect.size[1] // 12))
+        self.slider_image.fill((100, 255, 0))
+        self.slider = self.slider_image.get_rect(topleft=self.rect.topleft)
+
+        # Make ready
+        self.update_image()
+
+    def dispose(self):
+        super().dispose()
+        self.background = self.slider_image = None
+
+    def move_slider(self):
+        rect = self.rect
+        mouse_pos = min(max(0, (src.event.mouse_pos()[1] - rect.y)), self.rect.height - self.slider.height)
+        self.slider.y = rect.y + mouse_pos
+        try:
+            self.current_value = self.start + (mouse_pos / (self.rect.height - self.slider.height)) * (self.end - self.start)
+        except ZeroDivisionError:
+            self.current_value = self.start
+
+    def update_image(self):
+        _counters['blits'] += 2
+        self._image.blit(self.background, (0, 0))
+        self._image.blit(self.slider_image, (0, self.slider.y - self.rect.y))  # Relative position.
+        self.image_changed()
+
+    def update(self):
+        self.should_update = False  # Until the next mouse event.
+        if not self._enabled:
+            self.pressed = False
+            return
+        if self.pressed:
+            self.move_slider()
+            self.update_image()
+
+        left_click = src.event.mouse_pressed()[0]
+        if left_click:
+            mouse_pos = src.event.mouse_pos()
+            if self.slider.collidepoint(*mouse_pos):
+                self.pressed = True
+            elif self.rect.collidepoint(*mouse_pos):
+                self.move_slider()
+                self.update_image()
+        else:
+            self.pressed = False
+
+
+BUTTON_NORMAL, BUTTON_HOVERED, BUTTON_PRESSED, BUTTON_DISABLED = range(4)
+
+
+class StateImages(list):
+    """A button's image per state; a list rather than a tuple so the cache can hold it weakly."""
+
+    __slots__ = ('__weakref__',)
+
+
+# (size, color, highlight color) -> state images, shared by every button that looks the same for as long as one does.
+_button_images = weakref.WeakValueDictionary()
+
+
+def button_images(size, color, highlight_color):
+    """
+    The images of a button in each state (indexed by BUTTON_NORMAL etc.). They're shared, so never draw onto them.
+
+    :param color: Packed colors, see pack_color().
+    """
+    key = (tuple(size), color, highlight_color)
+    images = _button_images.get(key)
+    if images is None:
+        color, highlight_color = pygame.Color(color), pygame.Color(highlight_color)
+        fills = (
+            color - highlight_color, color, color + highlight_color,
+            (color - highlight_color).lerp(pygame.Color(128, 128, 128), 0.6)
+        )
+        images = StateImages(pygame.Surface(size) for _ in fills)
+        _counters['surface_allocations'] += len(images)
+        for image, fill in zip(images, fills):
+            image.fill(fill)
+        _button_images[key] = images
+    return images
+
+
+class Button(BaseWidget):
+    """
+    Renders its state images (normal, hovered, pressed, disabled) up front and switches between them by swapping
+    'image', so hovering and clicking cost no drawing.
+    """
+
+    __slots__ = ('_color', '_highlight_color', 'hovered', 'is_pressed', '_state_images')
+
+    follows_mouse = True
+
+    def __init__(self, **kwargs):
+        super(Button, self).__init__(**kwargs)
+
+        self._color = pack_color((100, 0, 100))
+        self._highlight_color = pack_color((50, 50, 50))
+
+        self.hovered = False
+        self.is_pressed = False
+
+        self.repaint()
+
+    @property
+    def color(self):
+        return pygame.Color(self._color)
+
+    @color.setter
+    def color(self, value):
+        self._color = pack_color(value)
+        self.request_repaint()
+
+    @property
+    def highlight_color(self):
+        return pygame.Color(self._highlight_color)
+
+    @highlight_color.setter
+    def highlight_color(self, value):
+        self._highlight_color = pack_color(value)
+        self.request_repaint()
+
+    @property
+    def state(self):
+        if not self._enabled:
+            return BUTTON_DISABLED
+        if self.is_pressed:
+            return BUTTON_PRESSED
+        return BUTTON_HOVERED if self.hovered else BUTTON_NORMAL
+
+    def update_image(self):
+        self._image = self._state_images[self.state]
+
+    def repaint(self):
+        self._state_images = button_images(self.rect.size, self._color, self._highlight_color)
+        self.update_image()
+
+    def resize_image(self):
+        self.repaint()
+
+    def dispose(self):
+        super().dispose()
+        self._state_images = None
+
+    def update(self):
+        self.should_update = False  # Until the next mouse event.
+        if not self._enabled:
+            self.hovered = self.is_pressed = False
+            return
+        mouse_pos = src.event.mouse_pos()
+        previous_hovered = self.hovered
+        if self.rect.collidepoint(*mouse_pos):
+            self.hovered = True
+        else:
+            self.hovered = False
+
+        left_click = src.event.mouse_pressed()[0]
+        previous_pressed = self.is_pressed
+        if left_click and self.hovered:
+            self.is_pressed = True
+        elif not left_click:
+            self.is_pressed = False
+
+        if previous_hovered != self.hovered or previous_pressed != self.is_pressed:
+            self.update_image()
+
+
+def layout_text(text, size, font_name, wrap=True, font_size=256):
+    """
+    Finds the largest font size (at most 'font_size') at which 'text' fits in an area of 'size', breaking lines
+    between words if 'wrap'. Only touches its arguments, so it's safe to run on a worker thread.
+
+    :return: (font_size, lines)
+    """
+    SysFont = src.fonts.SysFont
+
+    def measure(font_size, text_array):
+        font = SysFont(font_name, font_size)
+        return tuple(font.size(' '.join(row)) for row in text_array)
+
+    font_size, text_array = fit_rows([word.split() for word in text.splitlines()], size, measure, wrap, font_size)
+    return font_size, tuple(' '.join(row) for row in text_array)
+
+
+def fit_rows(text_array, size, measure, wrap=True, font_size=256):
+    """
+    The fitting of layout_text(), for rows of any kind of words: 'measure(font_size, text_array)' returns the
+    (width, height) of each row at a font size. Moves words to the next row in place while wrapping.
+
+    :return: (font_size, text_array)
+    """
+    rows = len(text_array)
+    appendable_rows = []
+    width, height = size
+    lower, upper = 0, font_size
+    found = False
+    while not found:
+        _counters['fit_iterations'] += 1
+        font_sizes = measure(font_size, text_array)  # Font size (width, height) of each row.
+        text_width = max(size[0] for size in font_sizes)
+        text_height = sum(size[1] for size in font_sizes)
+
+        if wrap:
+            # The surface cannot fit an exact font size so we'll return the lower of the two.
+            if upper - lower <= 1:
+                found = True
+            # Width exceed but height will fit one extra row.
+            elif text_width > width and text_height + text_height // rows <= height:
+                for row, x in enumerate(font_sizes):
+                    if x[0] == text_width:
+                        if len(text_array[row]) > 1:
+                            if row + 1 in appendable_rows:
+                                word = text_array[row].pop()
+                                text_array[row + 1].insert(0, word)
+                            else:
+                                word = text_array[row].pop()
+                                text_array.insert(row + 1, [word])
+                                appendable_rows.append(row + 1)
+                                rows += 1
+                        else:
+                            upper = font_size
+                            font_size = (lower + upper) // 2
+                        break
+            elif text_width > width or text_height > height:
+                upper = font_size
+                font_size = (lower + upper) // 2
+            elif text_width < width and text_height < height:
+                lower = font_size
+                font_size = (lower + upper) // 2
+            else:  # Fits exactly.
+                lower = font_size
+                found = True
+        else:
+            # The surface cannot fit an exact font size so we'll return the lower of the two.
+            if font_size == lower or font_size == upper:
+                found = True
+            elif text_width < width and text_height < height:
+                lower = font_size
+                font_size = (lower + upper) // 2
+            elif text_width > width or text_height > height:
+                upper = font_size
+                font_size = (lower + upper) // 2
+            else:  # Fits exactly.
+                lower = font_size
+                found = True
+
+    return lower, text_array
+
+
+ELLIPSIS = '\u2026'
+ELLIPSIS_MODES = ('end', 'middle', 'start')
+
+
+def _prefix_widths(font, text):
+    # Widths of text[:i] for every i, summing the width of each character (measured once per distinct one) rather than
+    # measuring a prefix per candidate. Kerning is left out, it's a pixel or two at most.
+    widths = {character: font.size(character)[0] for character in set(text)}
+    return [0, *itertools.accumulate(widths[character] for character in text)]
+
+
+def ellipsize(text, width, font, ellipsis='end'):
+    """
+    Shortens 'text' to fit in 'width' at 'font', replacing its end, middle or start (see ELLIPSIS_MODES) with an
+    ellipsis, by binary search over the widths of its prefixes.
+    """
+    if font.size(text)[0] <= width:
+        return text
+    prefix = _prefix_widths(font, text)
+    total = prefix[-1]
+    room = width - font.size(ELLIPSIS)[0]
+    if ellipsis == 'end':
+        end = max(0, bisect.bisect_right(prefix, room) - 1)
+        return text[:end].rstrip() + ELLIPSIS
+    if ellipsis == 'start':
+        start = min(len(text), bisect.bisect_left(prefix, total - room))
+        return ELLIPSIS + text[start:].lstrip()
+    if ellipsis == 'middle':
+        end = max(0, bisect.bisect_right(prefix, room / 2) - 1)
+        start = max(end, min(len(text), bisect.bisect_left(prefix, total - (room - prefix[end]))))
+        return text[:end].rstrip() + ELLIPSIS + text[start:].lstrip()
+    raise ValueError("Unknown ellipsis {!r}, expected one of {}".format(ellipsis, ELLIPSIS_MODES))
+
+
+def _break_line(text, prefix, start, width):
+    # End of the line of 'text' starting at 'start', breaking after the last word that fits, and the next line's start.
+    end = bisect.bisect_right(prefix, prefix[start] + width) - 1
+    if end >= len(text):
+        return len(text), len(text)
+    space = text.rfind(' ', start, end + 1)
+    if space > start:
+        end = space
+    else:
+        end = max(end, start + 1)  # A word longer than the line is broken anywhere.
+    following = end
+    while following < len(text) and text[following] == ' ':
+        following += 1
+    return end, following
+
+
+def truncate_text(text, size, font_name, font_size, wrap=True, ellipsis='end', max_lines=None):
+    """
+    Lays out text at a fixed font size instead of fitting it, the way layout_text() would otherwise: lines are broken
+    between words if 'wrap' (or only at its newlines), as many as fit in 'size' (and at most 'max_lines'), and the last
+    one holds the rest of the text, shortened by ellipsize(). Finds every break by binary search over prefix widths, so
+    it measures a label O(log n) times instead of rendering it at O(log n) font sizes.
+
+    :return: (font_size, lines)
+    """
+    font = src.fonts.SysFont(font_name, font_size)
+    width, height = size
+    count = max(1, height // font.get_linesize())
+    if max_lines:
+        count = min(count, max_lines)
+    paragraphs = text.split('\n')
+    lines = []
+    for number, paragraph in enumerate(paragraphs):
+        start = 0
+        prefix = None
+        while True:
+            if len(lines) == count - 1:
+                rest = ' '.join([paragraph[start:]] + paragraphs[number + 1:]).rstrip()
+                lines.append(ellipsize(rest, width, font, ellipsis))
+                return font_size, tuple(lines)
+            if not wrap:
+                lines.append(ellipsize(paragraph, width, font, ellipsis))
+                break
+            if prefix is None:
+                prefix = _prefix_widths(font, paragraph)
+            end, following = _break_line(paragraph, prefix, start, width)
+            lines.append(paragraph[start:end])
+            if following >= len(paragraph):
+                break
+            start = following
+    return font_size, tuple(lines)
+
+
+def rasterize_text(lines, size, font, text_color, anchor='topleft'):
+    """
+    Renders laid out lines, each anchored in its share of the height of an area of 'size'.
+
+    :return: Tuple of (surface, position in the area) per line.
+    """
+    width, height = size
+    h = height // len(lines) if lines else 0
+    _counters['text_renders'] += len(lines)
+    images = []
+    for row, line in enumerate(lines):
+        sub_surface = font.render(line, 1, text_color)
+        rect = pygame.Rect((0, h * row), (width, h))
+        pos = sub_surface.get_rect()
+        setattr(pos, anchor, getattr(rect, anchor))
+        images.append((sub_surface, pos.topleft))
+    return tuple(images)
+
+
+def draw_text(surface, lines, area, font, text_color, anchor='topleft'):
+    """
+    rasterize_text() straight onto the 'area' rect of 'surface', clipped to it. Fonts of the freetype backend render
+    into the surface without making a surface per line.
+    """
+    if not isinstance(font, src.fonts.SizedFace):
+        images = rasterize_text(lines, area.size, font, text_color, anchor)
+        _counters['blits'] += len(images)
+        clip = surface.get_clip()
+        surface.set_clip(area.clip(clip))
+        surface.blits([(image, (area.left + x, area.top + y)) for image, (x, y) in images], False)
+        surface.set_clip(clip)
+        return
+    visible = area.clip(surface.get_rect())
+    target = surface.subsurface(visible)
+    offset_x, offset_y = area.left - visible.left, area.top - visible.top
+    width, height = area.size
+    h = height // len(lines) if lines else 0
+    _counters['text_renders'] += len(lines)
+    for row, line in enumerate(lines):
+        rect = pygame.Rect((offset_x, offset_y + h * row), (width, h))
+        pos = font.get_rect(line)
+        setattr(pos, anchor, getattr(rect, anchor))
+        font.render_to(target, pos.topleft, line, text_color)
+
+
+def fit_text(text, size, font_name, text_color, background_color, anchor='topleft', wrap=True, font_size=256):
+    """
+    layout_text() and draw_text() onto one surface of 'size'.
+
+    :return: (font_size, surface)
+    """
+    font_size, lines = layout_text(text, size, font_name, wrap, font_size)
+    return_surface = pygame.Surface(size)
+    _counters['surface_allocations'] += 1
+    return_surface.fill(background_color)
+    draw_text(return_surface, lines, return_surface.get_rect(), src.fonts.SysFont(font_name, font_size), text_color,
+              anchor)
+    return font_size, return_surface
+
+
+def render_text(text, size, font_name, text_color, anchor='topleft', wrap=True, fixed=None):
+    """
+    Lays out and rasterizes the text of a TextBox. Returns (font_size, lines, font, line images).
+
+    :param fixed: (font size, ellipsis, max lines) to truncate the text at a fixed size with truncate_text() instead of
+                  fitting it.
+    """
+    if not text:
+        font_size = fixed[0] if fixed is not None else 1
+        return font_size, (), src.fonts.SysFont(font_name, font_size), ()
+    if fixed is None:
+        font_size, lines = layout_text(text, size, font_name, wrap)
+    else:
+        font_size, lines = truncate_text(text, size, font_name, fixed[0], wrap, fixed[1], fixed[2])
+    font = src.fonts.SysFont(font_name, font_size)
+    return font_size, lines, font, rasterize_text(lines, size, font, text_color, anchor)
+
+
+# A styled piece of the text of a RichTextBox. 'color' and 'font_name' are the widget's if None; 'scale' multiplies
+# the fitted font size.
+Run = collections.namedtuple('Run', 'text bold italic color scale font_name', defaults=(False, False, None, 1.0, None))
+
+
+def _run_font_key(run, font_name, font_size):
+    return run.font_name or font_name, max(1, round(font_size * run.scale)), run.bold, run.italic
+
+
+def run_words(runs):
+    """Rows of words of 'runs' for fit_rows(); a word is a tuple of (run index, text) pieces with no space between."""
+    rows = [[]]
+    word = []
+    for index, run in enumerate(runs):
+        for token in re.findall(r'\n|[^\S\n]+|\S+', run.text):
+            if token.isspace():
+                if word:
+                    rows[-1].append(tuple(word))
+                    word = []
+                if token == '\n':
+                    rows.append([])
+            else:
+                word.append((index, token))
+    if word:
+        rows[-1].append(tuple(word))
+    return rows
+
+
+def run_segments(row):
+    """Joins a row of words of run_words() into (run index, text) segments, one per change of run."""
+    segments = []
+    for number, word in enumerate(row):
+        for piece, (index, text) in enumerate(word):
+            if number and not piece:
+                segments[-1][1] += ' '
+            if segments and segments[-1][0] == index:
+                segments[-1][1] += text
+            else:
+                segments.append([index, text])
+    return tuple((index, text) for index, text in segments)
+
+
+def layout_runs(runs, size, font_name, wrap=True, font_size=256):
+    """
+    layout_text() for a sequence of Run: finds the largest font size at which the runs, each at its scale of it, fit
+    in an area of 'size'.
+
+    :return: (font_size, lines) with each line a tuple of (run index, text) segments.
+    """
+    SysFont = src.fonts.SysFont
+
+    def measure(font_size, text_array):
+        fonts = {}
+        sizes = []
+        for row in text_array:
+            width = height = 0
+            for index, text in run_segments(row):
+                key = _run_font_key(runs[index], font_name, font_size)
+                font = fonts.get(key)
+                if font is None:
+                    font = fonts[key] = SysFont(*key)
+                text_width, text_height = font.size(text)
+                width += text_width
+                height = max(height, text_height)
+            if not height:  # Empty line.
+                height = SysFont(font_name, font_size).size('')[1]
+            sizes.append((width, height))
+        return sizes
+
+    font_size, text_array = fit_rows(run_words(runs), size, measure, wrap, font_size)
+    return font_size, tuple(run_segments(row) for row in text_array)
+
+
+def rasterize_runs(lines, size, runs, font_name, font_size, text_color, anchor='topleft', cache=None, fonts=None):
+    """
+    rasterize_text() for the lines of layout_runs(): the segments of a line sit on a common baseline, and each line gets
+    a share of the height of the area as big as its own. Segment images are taken from 'cache' (as returned by the
+    last call) when their text, font and color didn't change.
+
+    :param fonts: Dict of the fonts by _run_font_key(), filled in as needed; pass the same one while 'font_size' stays.
+    :return: (tuple of (surface, position in the area) per segment, cache of the images used)
+    """
+    SysFont = src.fonts.SysFont
+    cache = cache or {}
+    used = {}
+    fonts = fonts if fonts is not None else {}
+    rows = []
+    for line in lines:
+        row = []
+        for index, text in line:
+            run = runs[index]
+            key = _run_font_key(run, font_name, font_size)
+            font = fonts.get(key)
+            if font is None:
+                font = fonts[key] = SysFont(*key)
+            image_key = (text, text_color if run.color is None else run.color) + key
+            image = used.get(image_key) or cache.get(image_key)
+            if image is None:
+                image = font.render(text, 1, pygame.Color(image_key[1]))
+                _counters['text_renders'] += 1
+            used[image_key] = image
+            row.append((image, font.get_ascent()))
+        rows.append(row)
+
+    width, height = size
+    ascents = [max((ascent for _, ascent in row), default=0) for row in rows]
+    base_key = (font_name, font_size, False, False)
+    if base_key not in fonts and not all(rows):  # Empty lines take the height of a plain one.
+        fonts[base_key] = SysFont(*base_key)
+    heights = [
+        max((ascents[number] - ascent + image.get_height() for image, ascent in row), default=0) or
+        fonts[base_key].get_linesize() for number, row in enumerate(rows)
+    ]
+    total = sum(heights) or 1
+    images = []
+    top = 0
+    for row, line_ascent, line_height in zip(rows, ascents, heights):
+        rect = pygame.Rect(0, height * top // total, width, height * line_height // total)
+        top += line_height
+        pos = pygame.Rect(0, 0, sum(image.get_width() for image, _ in row), line_height)
+        setattr(pos, anchor, getattr(rect, anchor))
+        x = pos.left
+        for image, ascent in row:
+            images.append((image, (x, pos.top + line_ascent - ascent)))
+            x += image.get_width()
+    return tuple(images), used
+
+
+class Style:
+    """
+    Immutable look of a TextBox: font, colors, border, padding, anchor and wrapping. Equal styles are the same object
+    (while one is in use), and widgets created from a style share its values instead of holding copies.
+    """
+
+    __slots__ = (
+        'font_name', 'text_color', 'background_color', 'border_color', 'border_size', 'padding', 'anchor', 'wrap',
+        '__weakref__'
+    )
+
+    _interned = weakref.WeakValueDictionary()
+
+    def __new__(
+            cls, font_name='Arial', text_color=pygame.Color('black'), background_color=pygame.Color('white'),
+            border_color=pygame.Color('grey'), border_size=3, padding=(0, 0), anchor='topleft', wrap=True
+    ):
+        key = (
+            font_name, pack_color(text_color), pack_color(background_color), pack_color(border_color), border_size,
+            tuple(padding), anchor, wrap
+        )
+        style = cls._interned.get(key)
+        if style is None:
+            style = object.__new__(cls)
+            for name, value in zip(cls.__slots__, key):
+                object.__setattr__(style, name, value)
+            cls._interned[key] = style
+        return style
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Style is immutable, use replace()")
+
+    def __reduce__(self):
+        return Style, tuple(getattr(self, name) for name in self.__slots__[:-1])
+
+    def replace(self, **changes):
+        """The style with some values changed."""
+        values = {name: getattr(self, name) for name in self.__slots__[:-1]}
+        values.update(changes)
+        return Style(**values)
+
+    def __repr__(self):
+        return 'Style({})'.format(', '.join(
+            '{}={!r}'.format(name, getattr(self, name)) for name in self.__slots__[:-1]
+        ))
+
+
+def _render_shared(text, size, font_name, text_color, anchor, wrap, fixed=None):
+    # render_text() for create_text_boxes(): every (text, size, font) is laid out once and every (layout, color,
+    # anchor) rasterized once, however many widgets ask for it. The results are only read, so they can be shared.
+    layouts, line_images = _shared_renders
+    key = (text, size, font_name, wrap, fixed)
+    layout = layouts.get(key)
+    if layout is None:
+        if not text:
+            font_size, lines = fixed[0] if fixed is not None else 1, ()
+        elif fixed is None:
+            font_size, lines = layout_text(text, size, font_name, wrap)
+        else:
+            font_size, lines = truncate_text(text, size, font_name, fixed[0], wrap, fixed[1], fixed[2])
+        layout = layouts[key] = (font_size, lines, src.fonts.SysFont(font_name, font_size))
+    font_size, lines, font = layout
+    key += (text_color, anchor)
+    images = line_images.get(key)
+    if images is None:
+        images = line_images[key] = rasterize_text(lines, size, font, pygame.Color(text_color), anchor)
+    return font_size, lines, font, images
+
+
+def create_text_boxes(style, positions, sizes, texts=None, cls=None, manager=None):
+    """
+    Builds many TextBox widgets (or of a subclass, like TextInput2) in one pass, laying out each distinct
+    (text, size, font) only once. Much faster than one constructor call per widget for big forms or grids.
+
+    :param style: Style of every widget, or a sequence with one per widget.
+    :param positions: Sequence (or N x 2 array) of top left corners.
+    :param sizes: (width, height) of every widget, or a sequence with one per widget.
+    :param texts: Sequence with one text per widget, or None for no text.
+    :param cls: TextBox if None.
+    :return: List of the widgets, in the order of 'positions'.
+    """
+    global _shared_renders
+    cls = TextBox if cls is None else cls
+    positions = positions.tolist() if hasattr(positions, 'tolist') else list(positions)
+    count = len(positions)
+    styles = [style] * count if isinstance(style, Style) else list(style)
+    sizes = sizes.tolist() if hasattr(sizes, 'tolist') else sizes
+    if len(sizes) == 2 and not hasattr(sizes[0], '__len__'):
+        sizes = [sizes] * count
+    texts = [''] * count if texts is None else texts
+
+    outer = _shared_renders
+    if outer is None:
+        _shared_renders = ({}, {})
+    try:
+        return [
+            cls(pos=pos, size=size, text=text, style=style, manager=manager)
+            for pos, size, text, style in zip(positions, sizes, texts, styles)
+        ]
+    finally:
+        _shared_renders = outer
+
+
+def _fixed_options(fixed_size, ellipsis, max_lines):
+    # TextBox._fixed: None for the defaults (fitting the text), so most widgets share the None.
+    if ellipsis not in ELLIPSIS_MODES:
+        raise ValueError("Unknown ellipsis {!r}, expected one of {}".format(ellipsis, ELLIPSIS_MODES))
+    fixed = (fixed_size, ellipsis, max_lines)
+    return fixed if fixed != (None, 'end', None) else None
+
+
+class TextBox(BaseWidget):
+
+    __slots__ = (
+        '_text_color', '_background_color', '_border_color', '_anchor', '_padding', '_wrap', '_border_size', '_text',
+        '_font_name', '_text_area', '_font_size', '_font', '_lines', '_line_images', '_dirty', '_fixed',
+        '_skin'
+    )
+
+    focusable = False
+
+    ATTRIBUTES = [
+        'anchor', 'background_color', 'border_color', 'border_size', 'ellipsis', 'fixed_size', 'font_name',
+        'font_size', 'image', 'max_lines', 'padding', 'rect', 'skin', 'text', 'text_color', 'wrap'
+    ]
+
+    def __init__(
+            self, pos=(0, 0), size=(0, 0), text='', font_name='Arial', text_color=pygame.Color('black'),
+            anchor='topleft', padding=(0, 0), background_color=pygame.Color('white'), border_color=pygame.Color('grey'),
+            border_size=3, wrap=True, manager=None, style=None, fixed_size=None, ellipsis='end', max_lines=None,
+            skin=None
+    ) -> None:
+        """
+        :param style: Style to take the font, colors, border, padding, anchor and wrap from, instead of the arguments.
+        :param fixed_size: Font size to show the text at, cut off with an ellipsis where it overflows (see
+                           truncate_text()), instead of searching for the largest size that fits. Much cheaper.
+        :param ellipsis: Where overflowing text is cut, one of ELLIPSIS_MODES.
+        :param max_lines: Most lines to show with 'fixed_size'; as many as fit if None.
+        :param skin: src.skins.Skin to draw instead of the background and border colors; translucent ones are put on
+                     the background color. 'border_size' still keeps the text off the border.
+        """
+        super().__init__(pos=pos, size=size, manager=manager)
+        if style is not None:
+            font_name, anchor, padding, wrap = style.font_name, style.anchor, style.padding, style.wrap
+            border_size = style.border_size
+            # Packed already; keeping them shares the style's int objects.
+            self._text_color, self._background_color, self._border_color = (
+                style.text_color, style.background_color, style.border_color
+            )
+        else:
+            # Colors.
+            self._text_color = pack_color(text_color)
+            self._background_color = pack_color(background_color)
+            self._border_color = pack_color(border_color)
+
+        # Text options.
+        self._anchor = anchor
+        self._padding = padding
+        self._wrap = wrap
+
+        # Pass.
+        self._border_size = border_size  # In pixels.
+        self._text = text
+        self._font_name = font_name
+        self._fixed = _fixed_options(fixed_size, ellipsis, max_lines)
+        self._skin = skin
+
+        # Dependent data.
+        self._layout_text_area()
+        self._font_size = 256
+        self._font = None
+        self._lines = ()
+        self._line_images = ()
+        self._dirty = CLEAN
+        self._relayout()
+
+    @property
+    def border_size(self):
+        return self._border_size
+
+    @border_size.setter
+    def border_size(self, value):
+        self._border_size = value
+        self._invalidate(LAYOUT)
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        self._text = value
+        self._invalidate(LAYOUT)
+
+    @property
+    def font_name(self):
+        return self._font_name
+
+    @font_name.setter
+    def font_name(self, value):
+        self._font_name = value
+        self._invalidate(LAYOUT)
+
+    @property
+    def font_size(self):
+        return self._font_size
+
+    @font_size.setter
+    def font_size(self, value):
+        self._font_size = value
+        self._invalidate(LAYOUT)
+
+    @property
+    def text_color(self):
+        return pygame.Color(self._text_color)
+
+    @text_color.setter
+    def text_color(self, value):
+        self._text_color = pack_color(value)
+        self._invalidate(RASTERIZE)
+
+    @property
+    def background_color(self):
+        return pygame.Color(self._background_color)
+
+    @background_color.setter
+    def background_color(self, background_color):
+        self._background_color = pack_color(background_color)
+        self._invalidate(COMPOSITE)
+
+    @property
+    def border_color(self):
+        return pygame.Color(self._border_color)
+
+    @border_color.setter
+    def border_color(self, border_color):
+        self._border_color = pack_color(border_color)
+        self._invalidate(COMPOSITE)
+
+    @property
+    def anchor(self):
+        return self._anchor
+
+    @anchor.setter
+    def anchor(self, value):
+        self._anchor = value
+        self._invalidate(RASTERIZE)
+
+    @property
+    def padding(self):
+        return self._padding
+
+    @padding.setter
+    def padding(self, value):
+        self._padding = value
+        self._invalidate(LAYOUT)
+
+    @property
+    def skin(self):
+        return self._skin
+
+    @skin.setter
+    def skin(self, value):
+        self._skin = value
+        self._invalidate(COMPOSITE)
+
+    @property
+    def fixed_size(self):
+        return self._fixed[0] if self._fixed is not None else None
+
+    @fixed_size.setter
+    def fixed_size(self, value):
+        self._set_fixed(value, self.ellipsis, self.max_lines)
+
+    @property
+    def ellipsis(self):
+        return self._fixed[1] if self._fixed is not None else 'end'
+
+    @ellipsis.setter
+    def ellipsis(self, value):
+        self._set_fixed(self.fixed_size, value, self.max_lines)
+
+    @property
+    def max_lines(self):
+        return self._fixed[2] if self._fixed is not None else None
+
+    @max_lines.setter
+    def max_lines(self, value):
+        self._set_fixed(self.fixed_size, self.ellipsis, value)
+
+    def _set_fixed(self, fixed_size, ellipsis, max_lines):
+        fixed = _fixed_options(fixed_size, ellipsis, max_lines)
+        if fixed != self._fixed:
+            self._fixed = fixed
+            self._invalidate(LAYOUT)
+
+    def _truncation(self):
+        # The 'fixed' argument of render_text().
+        return self._fixed if self._fixed is not None and self._fixed[0] is not None else None
+
+    def get_text_surface_and_font_size(self, font_size=256):
+        return fit_text(
+            self._text, self._text_area.size, self._font_name, pygame.Color(self._text_color),
+            pygame.Color(self._background_color), self._anchor, self._wrap, font_size
+        )
+
+    def _invalidate(self, level):
+        """
+        Marks what has to be redone on the next update: LAYOUT (font size and line breaks), RASTERIZE (rendering the
+        laid out lines) or, for changes that only need a repaint, COMPOSITE. Each level redoes the ones after it.
+        """
+        self._dirty = max(self._dirty, level)
+        self.should_update = True
+
+    def _fit_arguments(self):
+        # A snapshot, so the fitting can run on a worker thread while the widget keeps changing.
+        return (
+            self._text, self._text_area.size, self._font_name, pygame.Color(self._text_color), self._anchor, self._wrap,
+            self._truncation()
+        )
+
+    def _layout_text_area(self):
+        self._text_area = self._image.get_rect(
+            size=(self.rect.size[0] - self._border_size - self._padding[0] * 2,
+                  self.rect.size[1] - self._border_size - self._padding[1] * 2)
+        )
+        self._text_area.center = self._image.get_rect().center
+
+    def _relayout(self):
+        _counters['relayouts'] += 1
+        manager = self._manager
+        if _shared_renders is not None:
+            if manager is not None:
+                manager.cancel_render(self)
+            self.finish_render(*_render_shared(
+                self._text, self._text_area.size, self._font_name, self._text_color, self._anchor, self._wrap,
+                self._truncation()
+            ))
+        elif self._text and manager is not None and manager.render_pool is not None:
+            manager.submit_render(self, render_text, *self._fit_arguments())
+            if not self._line_images:
+                # Nothing shown yet (e.g. a new widget): show the chrome while the text renders, not a black surface.
+                self._composite()
+        else:
+            if manager is not None:
+                manager.cancel_render(self)
+            self.finish_render(*render_text(*self._fit_arguments()))
+
+    def finish_render(self, font_size, lines, font, line_images):
+        self._font_size = font_size
+        self._lines = lines
+        self._font = font
+        self._line_images = line_images
+        self._composite()
+
+    def _rasterize(self):
+        manager = self._manager
+        if manager is not None and manager.is_rendering(self):
+            # The pending render was started with the old colors and anchor, so it has to be redone.
+            self._relayout()
+            return
+        self._line_images = rasterize_text(
+            self._lines, self._text_area.size, self._font, pygame.Color(self._text_color), self._anchor
+        )
+        self._composite()
+
+    def _composite(self):
+        skin = self._skin
+        if skin is None:
+            skin = src.skins.BorderSkin(self._background_color, self._border_color, self._border_size)
+        _counters['blits'] += 1
+        self._image.blit(skin.frame(self._image.get_size(), self._background_color), (0, 0))
+        area = self._text_area
+        self._image.set_clip(area)
+        _counters['blits'] += len(self._line_images)
+        self._image.blits([(image, (area.left + x, area.top + y)) for image, (x, y) in self._line_images], False)
+        self._image.set_clip(None)
+        self.image_changed()
+
+    def dispose(self):
+        super().dispose()
+        self._font = None
+        self._lines = self._line_images = ()
+
+    def repaint(self):
+        if not self._dirty:  # Otherwise the coming update repaints it anyway.
+            self._composite()
+
+    # def _update_text_area(self):
+    #     text_array = [word.split() for word in self._text.splitlines()]
+    #     rows = len(text_array)
+    #     height = self._text_area.height
+    #
+    #     h = height // rows
+    #     for row, text_row in enumerate(text_array):
+    #         sub_surface = self._font.render(' '.join(text_row), 1, self._text_color)
+    #         rect = self._text_area.copy()
+    #         rect.height = h
+    #         rect.topleft = (0, h * row)
+    #         pos = sub_surface.get_rect()
+    #         setattr(pos, self._anchor, getattr(rect, self._anchor))
+    #         self._text_surface.blit(sub_surface, pos)
+    #     self._image.blit(self._text_surface, self._text_area)
+
+    def update(self):
+        if self._dirty == LAYOUT:
+            self._layout_text_area()
+            self._relayout()
+        elif self._dirty == RASTERIZE:
+            self._rasterize()
+        elif self._dirty == COMPOSITE:
+            self._composite()
+        self._dirty = CLEAN
+        self.should_update = False
+
+    def __repr__(self):
+        attributes = sorted(self.ATTRIBUTES)
+        values = []
+        for attribute in attributes:
+            if isinstance(getattr(type(self), attribute, None), property):
+                values.append(getattr(self, attribute))
+            else:
+                values.append(getattr(self, '_' + attribute))
+
+        return '{}: \n{}\n'.format(
+            self.__class__.__name__, '\n'.join('\t{} = {!r}'.format(name, value) for name, value in zip(attributes, values))
+        )
+
+
+class RichTextBox(TextBox):
+    """
+    TextBox whose text is a sequence of Run, each with its own boldness, slant, color, font and scale, fitted to the
+    box together like a TextBox's text:
+
+        status = RichTextBox(pos=(10, 10), size=(300, 40), runs=[Run('CPU '), Run('93%', bold=True, color=red)])
+        status.set_run(1, text='12%', color=green)
+
+    The image of every segment is kept, so a change to one run only renders that run again, and a change of color
+    only that without laying the text out again. Setting 'text' replaces the runs with a single plain one. The runs are
+    always fitted: 'fixed_size' and 'max_lines' raise ValueError.
+    """
+
+    __slots__ = ('_runs', '_segment_images', '_run_fonts')
+
+    ATTRIBUTES = TextBox.ATTRIBUTES + ['runs']
+
+    def __init__(self, runs=None, **kwargs):
+        """
+        :param runs: Sequence of Run; a single Run of 'text' if None.
+        """
+        _check_unfixed(kwargs.get('fixed_size'), kwargs.get('max_lines'))
+        if runs is None:
+            runs = (Run(kwargs.get('text', '')),)
+        self._runs = tuple(_packed_run(run) for run in runs)
+        self._segment_images = {}
+        self._run_fonts = {}  # Fonts of the runs at the current font size, by _run_font_key().
+        kwargs['text'] = ''.join(run.text for run in self._runs)
+        super(RichTextBox, self).__init__(**kwargs)
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        self.runs = (Run(value),)
+
+    @property
+    def runs(self):
+        return self._runs
+
+    @runs.setter
+    def runs(self, runs):
+        self._runs = tuple(_packed_run(run) for run in runs)
+        self._text = ''.join(run.text for run in self._runs)
+        self._invalidate(LAYOUT)
+
+    def set_run(self, index, **changes):
+        """Changes fields of one run, e.g. set_run(2, text='OK', color='green')."""
+        runs = list(self._runs)
+        old = runs[index]
+        runs[index] = run = _packed_run(old._replace(**changes))
+        self._runs = tuple(runs)
+        if run._replace(color=old.color) == old:
+            self._invalidate(RASTERIZE)
+        else:
+            self._text = ''.join(run.text for run in self._runs)
+            self._invalidate(LAYOUT)
+
+    def _set_fixed(self, fixed_size, ellipsis, max_lines):
+        _check_unfixed(fixed_size, max_lines)
+        super(RichTextBox, self)._set_fixed(fixed_size, ellipsis, max_lines)
+
+    def _relayout(self):
+        # Synchronous, also with render workers: the segment images are reused from the last render.
+        _counters['relayouts'] += 1
+        if self._manager is not None:
+            self._manager.cancel_render(self)
+        if self._text.strip():
+            self._font_size, self._lines = layout_runs(self._runs, self._text_area.size, self._font_name, self._wrap)
+        else:
+            self._font_size, self._lines = 1, ()
+        self._font = src.fonts.SysFont(self._font_name, self._font_size)
+        self._run_fonts = {(self._font_name, self._font_size, False, False): self._font}  # Only kept at one size.
+        self._rasterize()
+
+    def _rasterize(self):
+        self._line_images, self._segment_images = rasterize_runs(
+            self._lines, self._text_area.size, self._runs, self._font_name, self._font_size, self._text_color,
+            self._anchor, self._segment_images, self._run_fonts
+        )
+        self._composite()
+
+    def dispose(self):
+        super(RichTextBox, self).dispose()
+        self._segment_images = {}
+        self._run_fonts = {}
+
+
+def _check_unfixed(fixed_size, max_lines):
+    if fixed_size is not None or max_lines is not None:
+        raise ValueError("RichTextBox can't truncate its runs; it doesn't support fixed_size or max_lines")
+
+
+def _packed_run(run):
+    return run if run.color is None else run._replace(color=pack_color(run.color))
+
+
+class TextInput(BaseWidget):
+
+    __slots__ = (
+        'size', 'color', 'font', 'text', 'composition', 'text_image', 'caret', 'caret_time', 'caret_shown',
+        '_previous_repeat'
+    )
+
+    text_input = True
+
+    KEY_REPEAT = (400, 35)  # Delay and interval in milliseconds, while focused.
+    BORDER_SIZE = 3
+
+    def __init__(self, **kwargs):
+        """
+        Takes its text from TEXTINPUT events, so any character the keyboard layout or input method produces works.
+        TEXTEDITING (an input method's uncommitted text) is shown after the text until it's committed.
+        :param size:
+        :param pos:
+        """
+        super(TextInput, self).__init__(**kwargs)
+        self.size = self.rect.size
+
+        self.color = {
+            "text": pack_color("black"),
+            "border": pack_color("dark grey"),
+            "border_focused": pack_color("light grey"),
+            "background": pack_color("white")
+        }
+
+        self._image.fill(pygame.Color(self.color["background"]))
+        self.font = src.fonts.SysFont("Arial", 4 * self.size[1] // 5)
+        self.text = []
+        self.composition = ''
+        self.text_image = pygame.Surface(self.size)
+        _counters['surface_allocations'] += 1
+
+        self.caret = pygame.Rect((4, 2), (1, self.size[1] - 5))
+        self.caret_time = src.event.get_ticks()
+        self.caret_shown = False
+        self._previous_repeat = None
+        self.should_update = False  # Updated while focused, for the caret blink.
+
+    @property
+    def command_chars(self):
+        return {pygame.K_BACKSPACE: self.backspace}
+
+    def backspace(self):
+        try:
+            self.text.pop(-1)
+        except IndexError:
+            pass
+
+    def update_image(self, focused=None):
+        """
+        :param focused: Whether to draw the border, which only shows while focused; None checks the manager's focus.
+        """
+        if focused is None:
+            focused = self.has_focus
+        border = self.color['border'] if focused else self.color['background']
+        skin = src.skins.BorderSkin(self.color['background'], border, self.BORDER_SIZE)
+        self._image.blit(skin.frame(self.size), (0, 0))
+        self.text_image = self.font.render(
+            "".join(self.text) + self.composition, 1, pygame.Color(self.color["text"]),
+            pygame.Color(self.color["background"])
+        )
+        _counters['text_renders'] += 1
+        _counters['blits'] += 2
+        self._image.set_clip(self._image.get_rect().inflate(-2 * self.BORDER_SIZE, -2 * self.BORDER_SIZE))
+        self._image.blit(self.text_image, (4, (self.size[1] - self.text_image.get_height()) // 2))
+        self._image.set_clip(None)
+        if self.composition:
+            # Underline the uncommitted part, like input methods do.
+            composed = self.font.size(self.composition)[0]
+            right = 4 + self.text_image.get_width()
+            bottom = (self.size[1] + self.text_image.get_height()) // 2 - 2
+            pygame.draw.line(self._image, pygame.Color(self.color["text"]), (right - composed, bottom), (right, bottom))
+        if self.caret_shown:
+            self.caret.left = self.text_image.get_rect().right + 4
+            pygame.draw.rect(self._image, (0, 0, 0), self.caret)
+        self.image_changed()
+
+    def handle_event(self, event):
+        if event.type == pygame.TEXTINPUT:
+            self.text.extend(event.text)
+            self.composition = ''
+        elif event.type == pygame.TEXTEDITING:
+            self.composition = event.text
+        elif event.type == pygame.KEYDOWN and event.key in self.command_chars:
+            self.command_chars[event.key]()
+        else:
+            return
+        self.caret_shown = True
+        self.caret_time = src.event.get_ticks()
+        self.update_image()
+
+    def update(self):
+        if src.event.get_ticks() - self.caret_time >= 500:
+            self.caret_shown = not self.caret_shown
+            self.caret_time = src.event.get_ticks()
+            self.update_image()
+
+    def dispose(self):
+        super().dispose()
+        self.font = self.text_image = None
+
+    def next_timer(self):
+        return self.caret_time + 500
+
+    def focus(self):
+        pygame.key.start_text_input()
+        pygame.key.set_text_input_rect(self.rect)  # Where the input method puts its candidate window.
+        self._previous_repeat = pygame.key.get_repeat()
+        pygame.key.set_repeat(*self.KEY_REPEAT)
+        self.caret_shown = True
+        self.caret_time = src.event.get_ticks()
+        self.update_image()
+
+    def unfocus(self):
+        if self._previous_repeat is not None:
+            pygame.key.set_repeat(*self._previous_repeat)
+            self._previous_repeat = None
+        self.composition = ''
+        self.caret_shown = False
+        self.update_image(focused=False)
+
+
+class TextInput2(TextBox):
+
+    __slots__ = ('caret', 'caret_time', 'caret_shown')
+
+    focusable = True
+    text_input = True
+
+    def __init__(self, **kwargs):
+        """
+        Limitations: only 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890,.+-' and shift, tab,
+                     return are supported.
+        :param size:
+        :param pos:
+        """
+        self.caret_shown = False
+        super(TextInput2, self).__init__(**kwargs)
+
+        self.caret = pygame.Rect(self._text_area.topleft, (self.rect.width // 50, self._text_area.height - 4))
+        self.caret_time = src.event.get_ticks()
+        self.caret_shown = False
+
+    @property
+    def command_chars(self):
+        return {"backspace": self.backspace}
+
+    def backspace(self):
+        self.text = self.text[:-1]
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_BACKSPACE:
+                self.backspace()
+            elif event.unicode:
+                self.text += event.unicode
+
+    def update(self):
+        if not self.has_focus:
+            self.caret_shown = False  # Also for text set by code while unfocused.
+        elif src.event.get_ticks() - self.caret_time >= 500:
+            self.caret_shown = not self.caret_shown
+            self.caret_time = src.event.get_ticks()
+            self._invalidate(COMPOSITE)  # Only the caret changed; the text keeps its layout.
+        super(TextInput2, self).update()
+
+    def _composite(self):
+        super(TextInput2, self)._composite()
+        if self.caret_shown:
+            if self._text and self._font is not None:
+                rows = tuple(filter(None, self._text.split('\r')))
+                caret_height = self._font.size(rows[0])[1]
+                word_width = self._font.size(rows[-1])[0]
+                self.caret.left = self._text_area.left + word_width
+                self.caret.height = caret_height
+                self.caret.bottom = caret_height * len(rows) + self._border_size
+            else:
+                self.caret.left = self._text_area.left
+            pygame.draw.rect(self._image, (0, 0, 0), self.caret)
+
+    def next_timer(self):
+        return self.caret_time + 500 if self.has_focus else None
+
+    def focus(self):
+        pygame.key.start_text_input()  # KEYDOWN events only carry 'unicode' with text input on.
+        self.caret_shown = True
+        self.caret_time = src.event.get_ticks()
+        self._composite()
+
+    def unfocus(self):
+        self.caret_shown = False
+        self._composite()
+
+
+def _scrap():
+    # pygame.scrap has to be initialised (after pygame.display.set_mode) before its first use.
+    if not pygame.scrap.get_init():
+        pygame.scrap.init()
+    return pygame.scrap
+
+
+def clipboard_put(text):
+    """Puts text on the system clipboard. Does nothing if there's no clipboard, e.g. with the dummy video driver."""
+    try:
+        scrap = _scrap()
+        if hasattr(scrap, 'put'):
+            scrap.put(pygame.SCRAP_TEXT, text.encode('utf-8'))
+        else:
+            scrap.put_text(text)
+    except pygame.error:
+        pass
+
+
+def clipboard_get():
+    """Text on the system clipboard, or '' if there's none."""
+    try:
+        scrap = _scrap()
+        if not hasattr(scrap, 'get'):
+            return scrap.get_text()
+        data = scrap.get(pygame.SCRAP_TEXT)
+    except pygame.error:
+        return ''
+    return data.decode('utf-8', 'replace').rstrip('\x00') if data else ''
+
+
+class TextArea(BaseWidget):
+    """
+    Multi-line text editor for large documents. The text is kept in a src.rope.Rope, so edits cost O(log n) however
+    long it is, and only the visible rows whose contents changed are repainted; rendered lines are cached by text.
+
+    Supports caret movement (arrows, home/end, page up/down, ctrl for the document ends), shift or mouse selection,
+    the clipboard (ctrl+a/c/x/v) and scrolling with the wheel or by following the caret.
+    """
+
+    __slots__ = (
+        'rope', 'font', 'line_height', 'padding', 'caret', 'anchor', 'goal_column', 'scroll', 'scroll_x',
+        'caret_time', 'caret_shown', 'dragging', '_text_color', '_background_color', '_selection_color', '_rows',
+        '_surfaces', '_previous_repeat'
+    )
+
+    text_input = True
+
+    KEY_REPEAT = TextInput.KEY_REPEAT
+    SURFACE_CACHE_SIZE = 512  # Rendered lines kept around for scrolling back.
+    MAX_COLUMNS = 1024  # Longer lines are only drawn up to here.
+    WHEEL_LINES = 3
+
+    def __init__(
+            self, pos=(0, 0), size=(0, 0), text='', font_name='Arial', font_size=16, text_color=pygame.Color('black'),
+            background_color=pygame.Color('white'), selection_color=pygame.Color(173, 214, 255), padding=4, manager=None
+    ):
+        super().__init__(pos=pos, size=size, manager=manager)
+        self._text_color = pack_color(text_color)
+        self._background_color = pack_color(background_color)
+        self._selection_color = pack_color(selection_color)
+        self.font = src.fonts.SysFont(font_name, font_size)
+        self.line_height = self.font.get_linesize()
+        self.padding = padding
+
+        self.rope = src.rope.Rope(text.replace('\r\n', '\n'))
+        self.caret = 0
+        self.anchor = None  # Other end of the selection, if any.
+        self.goal_column = None  # Column kept while moving up and down through shorter lines.
+        self.scroll = 0  # First visible line.
+        self.scroll_x = 0  # In pixels.
+        self.caret_time = src.event.get_ticks()
+        self.caret_shown = False
+        self.dragging = False
+        self._surfaces = {}
+        self._previous_repeat = None
+        self._reset_rows()
+        self.should_update = False  # Updated while focused, like the inputs.
+
+    @property
+    def text(self):
+        return str(self.rope)
+
+    @text.setter
+    def text(self, value):
+        self.rope = src.rope.Rope(value.replace('\r\n', '\n'))
+        self.caret = 0
+        self.anchor = None
+        self.scroll = self.scroll_x = 0
+        self._redraw()
+
+    @property
+    def visible_rows(self):
+        return max(1, (self.rect.height - 2 * self.padding) // self.line_height)
+
+    @property
+    def selection(self):
+        """(start, end) offsets of the selected text, or None."""
+        if self.anchor is None or self.anchor == self.caret:
+            return None
+        return min(self.anchor, self.caret), max(self.anchor, self.caret)
+
+    @property
+    def selected_text(self):
+        selection = self.selection
+        return self.rope.slice(*selection) if selection else ''
+
+    def line_column(self, offset):
+        line = self.rope.line_of(offset)
+        return line, offset - self.rope.line_start(line)
+
+    def offset_at(self, line, column):
+        line = max(0, min(line, self.rope.line_count - 1))
+        return min(self.rope.line_start(line) + column, self.rope.line_end(line))
+
+    def offset_at_pos(self, pos):
+        x = pos[0] - self.rect.left - self.padding + self.scroll_x
+        line = self.scroll + (pos[1] - self.rect.top - self.padding) // self.line_height
+        line = max(0, min(line, self.rope.line_count - 1))
+        text = self.rope.line(line)[:self.MAX_COLUMNS]
+        # Binary search for the first column past x, then pick the nearer of it and the one before.
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high) // 2
+            if self.font.size(text[:middle + 1])[0] <= x:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(text) and x - self.font.size(text[:low])[0] > self.font.size(text[:low + 1])[0] - x:
+            low += 1
+        return self.rope.line_start(line) + low
+
+    # Editing.
+
+    def insert(self, text):
+        self.delete_selection()
+        self.rope.insert(self.caret, text)
+        self.caret += len(text)
+        self._edited()
+
+    def delete_selection(self):
+        selection = self.selection
+        self.anchor = None
+        if selection is None:
+            return False
+        self.rope.delete(*selection)
+        self.caret = selection[0]
+        return True
+
+    def backspace(self):
+        if not self.delete_selection() and self.caret > 0:
+            self.rope.delete(self.caret - 1, self.caret)
+            self.caret -= 1
+        self._edited()
+
+    def delete(self):
+        if not self.delete_selection():
+            self.rope.delete(self.caret, self.caret + 1)
+        self._edited()
+
+    def copy(self):
+        if self.selection:
+            clipboard_put(self.selected_text)
+
+    def cut(self):
+        self.copy()
+        if self.delete_selection():
+            self._edited()
+
+    def paste(self):
+        text = clipboard_get()
+        if text:
+            self.insert(text.replace('\r\n', '\n'))
+
+    def select_all(self):
+        self.anchor = 0
+        self.move_caret(len(self.rope), select=True)
+
+    def _edited(self):
+        self.goal_column = None
+        self._show_caret()
+        self._scroll_to_caret()
+        self._redraw()
+
+    # Caret movement.
+
+    def move_caret(self, offset, select=False, keep_column=False):
+        if select and self.anchor is None:
+            self.anchor = self.caret
+        elif not select:
+            self.anchor = None
+        self.caret = max(0, min(offset, len(self.rope)))
+        if not keep_column:
+            self.goal_column = None
+        self._show_caret()
+        self._scroll_to_caret()
+        self._redraw()
+
+    def _move_lines(self, lines, select):
+        line, column = self.line_column(self.caret)
+        if self.goal_column is None:
+            self.goal_column = column
+        self.move_caret(self.offset_at(line + lines, self.goal_column), select, keep_column=True)
+
+    def _move_horizontally(self, step, select):
+        selection = self.selection
+        if selection is not None and not select:
+            self.move_caret(selection[0] if step < 0 else selection[1])
+        else:
+            self.move_caret(self.caret + step, select)
+
+    def scroll_to(self, line):
+        self.scroll = max(0, min(line, self.rope.line_count - self.visible_rows))
+        self._redraw()
+
+    def _scroll_to_caret(self):
+        line, column = self.line_column(self.caret)
+        rows = self.visible_rows
+        if line < self.scroll:
+            self.scroll = line
+        elif line >= self.scroll + rows:
+            self.scroll = line - rows + 1
+
+        x = self.font.size(self.rope.line(line)[:min(column, self.MAX_COLUMNS)])[0]
+        width = self.rect.width - 2 * self.padding
+        if x < self.scroll_x:
+            self.scroll_x = max(0, x - width // 4)
+        elif x >= self.scroll_x + width:
+            self.scroll_x = x - width * 3 // 4
+
+    def _show_caret(self):
+        self.caret_shown = True
+        self.caret_time = src.event.get_ticks()
+
+    # Events.
+
+    def handle_event(self, event):
+        if event.type == pygame.TEXTINPUT:
+            self.insert(event.text)
+        elif event.type == pygame.KEYDOWN:
+            select = event.mod & pygame.KMOD_SHIFT
+            control = event.mod & pygame.KMOD_CTRL
+            key = event.key
+            if control and key in self.CONTROL_COMMANDS:
+                self.CONTROL_COMMANDS[key](self)
+            elif key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+                self.insert('\n')
+            elif key == pygame.K_BACKSPACE:
+                self.backspace()
+            elif key == pygame.K_DELETE:
+                self.delete()
+            elif key in (pygame.K_LEFT, pygame.K_RIGHT):
+                self._move_horizontally(-1 if key == pygame.K_LEFT else 1, select)
+            elif key in (pygame.K_UP, pygame.K_DOWN):
+                self._move_lines(-1 if key == pygame.K_UP else 1, select)
+            elif key in (pygame.K_PAGEUP, pygame.K_PAGEDOWN):
+                self._move_lines(self.visible_rows * (-1 if key == pygame.K_PAGEUP else 1), select)
+            elif key == pygame.K_HOME:
+                line = self.rope.line_of(self.caret)
+                self.move_caret(0 if control else self.rope.line_start(line), select)
+            elif key == pygame.K_END:
+                line = self.rope.line_of(self.caret)
+                self.move_caret(len(self.rope) if control else self.rope.line_end(line), select)
+
+    CONTROL_COMMANDS = {pygame.K_a: select_all, pygame.K_c: copy, pygame.K_x: cut, pygame.K_v: paste}
+
+    def update(self):
+        for event in src.event.get():
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.rect.collidepoint(event.pos):
+                self.move_caret(self.offset_at_pos(event.pos), select=pygame.key.get_mods() & pygame.KMOD_SHIFT)
+                self.dragging = True
+            elif event.type == pygame.MOUSEWHEEL and self.rect.collidepoint(src.event.mouse_pos()):
+                self.scroll_to(self.scroll - event.y * self.WHEEL_LINES)
+
+        if self.dragging:
+            if src.event.mouse_pressed()[0]:
+                offset = self.offset_at_pos(src.event.mouse_pos())
+                if offset != self.caret:
+                    self.move_caret(offset, select=True)
+            else:
+                self.dragging = False
+
+        if src.event.get_ticks() - self.caret_time >= 500:
+            self.caret_shown = not self.caret_shown
+            self.caret_time = src.event.get_ticks()
+            self._redraw()
+
+    def next_timer(self):
+        return self.caret_time + 500
+
+    def focus(self):
+        pygame.key.start_text_input()
+        pygame.key.set_text_input_rect(self.rect)
+        self._previous_repeat = pygame.key.get_repeat()
+        pygame.key.set_repeat(*self.KEY_REPEAT)
+        self._show_caret()
+        self._redraw()
+
+    def unfocus(self):
+        if self._previous_repeat is not None:
+            pygame.key.set_repeat(*self._previous_repeat)
+            self._previous_repeat = None
+        self.caret_shown = False
+        self.dragging = False
+        self._redraw()
+
+    def dispose(self):
+        super().dispose()
+        self.rope = src.rope.Rope()
+        self._surfaces.clear()
+        self._rows = []
+
+    # Drawing.
+
+    def resize_image(self):
+        self._image = pygame.Surface(self.rect.size)
+        _counters['surface_allocations'] += 1
+        self._reset_rows()
+
+    def _reset_rows(self):
+        self._image.fill(pygame.Color(self._background_color))
+        self.image_changed()
+        self._rows = [None] * self.visible_rows  # What each row shows, to skip the ones that didn't change.
+        self._redraw()
+
+    def _surface(self, text):
+        surface = self._surfaces.get(text)
+        if surface is None:
+            if len(self._surfaces) >= self.SURFACE_CACHE_SIZE:
+                self._surfaces.clear()
+            surface = self.font.render(text, True, pygame.Color(self._text_color))
+            _counters['text_renders'] += 1
+            self._surfaces[text] = surface
+        return surface
+
+    def _redraw(self):
+        lines = self.rope.lines(self.scroll, len(self._rows))
+        selection = self.selection
+        caret_line, caret_column = self.line_column(self.caret) if self.caret_shown else (None, None)
+        start = self.rope.line_start(self.scroll)
+
+        for row, previous in enumerate(self._rows):
+            line = self.scroll + row
+            if row < len(lines):
+                text = lines[row][:self.MAX_COLUMNS]
+                end = start + len(lines[row])
+                selected = None
+                if selection is not None and selection[0] <= end and selection[1] > start:
+                    # Past the end of the line means the newline is selected too.
+                    selected = (max(selection[0], start) - start, min(selection[1] - start, len(text) + 1))
+                state = (text, selected, caret_column if line == caret_line else None, self.scroll_x)
+                start = end + 1
+            else:
+                state = None
+            if state != previous:
+                self._draw_row(row, state)
+                self._rows[row] = state
+
+    def _draw_row(self, row, state):
+        area = pygame.Rect(
+            self.padding, self.padding + row * self.line_height, self.rect.width - 2 * self.padding, self.line_height
+        )
+        self._image.set_clip(area)
+        self._image.fill(pygame.Color(self._background_color), area)
+        if state is not None:
+            text, selected, caret_column, scroll_x = state
+            left = area.left - scroll_x
+            if selected is not None:
+                x1 = self.font.size(text[:selected[0]])[0]
+                x2 = self.font.size(text[:selected[1]])[0]
+                if selected[1] > len(text):
+                    x2 += self.font.size(' ')[0]
+                self._image.fill(pygame.Color(self._selection_color), (left + x1, area.top, x2 - x1, area.height))
+            if text:
+                _counters['blits'] += 1
+                self._image.blit(self._surface(text), (left, area.top))
+            if caret_column is not None:
+                x = left + self.font.size(text[:caret_column])[0]
+                pygame.draw.line(self._image, pygame.Color(self._text_color), (x, area.top), (x, area.bottom - 1))
+        self._image.set_clip(None)
+        self.image_changed()
+
+
+all_widgets = WidgetManager()